@@ -0,0 +1,86 @@
+"""Handler resolution cost: building the handler on every dispatch versus
+resolving it from the container (singleton and per-dispatch transient).
+
+Run from the backend directory: ``python benchmarks/di_container.py``
+"""
+import asyncio
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from shared.domain.command import Command
+from shared.domain.command_handler import CommandHandler
+from shared.infrastructure.command_bus.command_handlers import CommandHandlers
+from shared.infrastructure.command_bus.in_memory_command_bus import InMemoryCommandBus
+from shared.infrastructure.dependency_injection.container import Container, Lifetime
+
+ITERATIONS = 200_000
+
+
+class Session:
+    pass
+
+
+class CandidateRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+
+class ApproveCandidate(Command):
+    pass
+
+
+class ApproveCandidateHandler(CommandHandler[ApproveCandidate]):
+    def __init__(self, repository: CandidateRepository):
+        self.repository = repository
+
+    async def handle(self, command: ApproveCandidate) -> None:
+        return None
+
+
+class ManualApproveCandidateHandler(ApproveCandidateHandler):
+    """Baseline: the handler builds its own dependencies"""
+
+    def __init__(self):
+        super().__init__(CandidateRepository(Session()))
+
+
+def container(lifetime: Lifetime) -> Container:
+    result = Container()
+    result.register(Session, lifetime=lifetime)
+    result.register(CandidateRepository, lifetime=lifetime)
+    result.register(ApproveCandidateHandler, lifetime=lifetime)
+    return result
+
+
+async def dispatch_all(bus: InMemoryCommandBus) -> float:
+    command = ApproveCandidate()
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await bus.dispatch(command)
+    return (time.perf_counter() - started) / ITERATIONS * 1e9
+
+
+def main() -> None:
+    singletons = container(Lifetime.SINGLETON)
+    transients = container(Lifetime.TRANSIENT)
+    print(f"resolve singleton: {timeit.timeit(lambda: singletons.resolve(ApproveCandidateHandler), number=ITERATIONS) / ITERATIONS * 1e9:,.0f} ns")
+    print(f"resolve transient: {timeit.timeit(lambda: transients.resolve(ApproveCandidateHandler), number=ITERATIONS) / ITERATIONS * 1e9:,.0f} ns")
+    print(f"construct handler: {timeit.timeit(ManualApproveCandidateHandler, number=ITERATIONS) / ITERATIONS * 1e9:,.0f} ns")
+
+    buses = {
+        'dispatch, handler built per call': (None, ManualApproveCandidateHandler),
+        'dispatch, singleton handler': (singletons, ApproveCandidateHandler),
+        'dispatch, transient handler': (transients, ApproveCandidateHandler),
+    }
+    for label, (bus_container, handler_class) in buses.items():
+        bus = InMemoryCommandBus(CommandHandlers(), bus_container)
+        bus.register(ApproveCandidate, handler_class)
+        print(f"{label}: {asyncio.run(dispatch_all(bus)):,.0f} ns")
+
+
+if __name__ == '__main__':
+    main()
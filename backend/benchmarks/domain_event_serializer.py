@@ -0,0 +1,102 @@
+"""Events per second serialized and deserialized by the previous path
+(``to_primitives`` + ``json``) and by ``DomainEventCompiledSerializer``,
+with orjson when installed and with the standard library.
+
+Run from the backend directory: ``python benchmarks/domain_event_serializer.py``
+"""
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from shared.domain.events import DomainEvent
+from shared.domain.value_objects import StringValueObject
+from shared.infrastructure.event_bus import domain_event_compiled_serializer
+from shared.infrastructure.event_bus.domain_event_compiled_serializer import DomainEventCompiledSerializer
+from shared.infrastructure.event_bus.domain_event_json_serializer import DomainEventJsonSerializer
+from shared.infrastructure.event_bus.domain_event_registry import DomainEventRegistry
+
+ITERATIONS = 100_000
+
+
+class CandidateStatus(Enum):
+    NEW = 'NEW'
+    APPROVED = 'APPROVED'
+
+
+@dataclass(frozen=True)
+class CandidateName(StringValueObject):
+    pass
+
+
+@dataclass
+class CandidateMoved(DomainEvent):
+    process_id: str = ''
+    stage: int = 0
+
+
+@dataclass
+class CandidateEvaluated(DomainEvent):
+    status: CandidateStatus = CandidateStatus.NEW
+    score: Decimal = Decimal('0')
+    process_id: Optional[UUID] = None
+    skills: List[str] = field(default_factory=list)
+    evaluated_at: Optional[datetime] = None
+    interview_days: Tuple[date, ...] = ()
+    name: Optional[CandidateName] = None
+    ratings: Dict[str, int] = field(default_factory=dict)
+
+
+def per_second(operation: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        operation()
+    return ITERATIONS / (time.perf_counter() - started)
+
+
+def run(label: str, event: DomainEvent, serializer: DomainEventCompiledSerializer) -> None:
+    payload = serializer.serialize(event)
+    old_payload = json.dumps(DomainEventJsonSerializer.serialize(event))
+    old_serialize = per_second(lambda: json.dumps(DomainEventJsonSerializer.serialize(event)).encode())
+    new_serialize = per_second(lambda: serializer.serialize(event))
+    old_deserialize = per_second(lambda: DomainEventJsonSerializer.deserialize(json.loads(old_payload)))
+    new_deserialize = per_second(lambda: serializer.deserialize(payload))
+    print(
+        f"{label}: serialize {old_serialize:,.0f}/s -> {new_serialize:,.0f}/s "
+        f"({new_serialize / old_serialize:.1f}x), deserialize {old_deserialize:,.0f}/s "
+        f"(dict only) -> {new_deserialize:,.0f}/s (typed event)"
+    )
+
+
+def main() -> None:
+    serializer = DomainEventCompiledSerializer(DomainEventRegistry([CandidateMoved, CandidateEvaluated]))
+    plain = CandidateMoved.create('candidate-1', process_id='process-1', stage=2)
+    rich = CandidateEvaluated.create(
+        'candidate-2',
+        status=CandidateStatus.APPROVED,
+        score=Decimal('8.50'),
+        process_id=uuid4(),
+        skills=['python', 'sql'],
+        evaluated_at=datetime.now(timezone.utc),
+        interview_days=(date.today(),),
+        name=CandidateName('Ana'),
+        ratings={'technical': 4}
+    )
+    backend = 'orjson' if domain_event_compiled_serializer.orjson is not None else 'json'
+    run(f"plain, {backend}", plain, serializer)
+    run(f"rich, {backend}", rich, serializer)
+    domain_event_compiled_serializer.orjson = None
+    run('plain, json', plain, serializer)
+    run('rich, json', rich, serializer)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Bytes per instance of slotted events, value objects and criteria versus
+the same state held in an instance ``__dict__``, the layout these classes
+had before they were declared with ``slots=True``.
+
+Run from the backend directory: ``python benchmarks/value_object_memory.py``
+"""
+from dataclasses import is_dataclass, make_dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from shared.domain.criteria.filter import Filter
+from shared.domain.events import DomainEvent
+from shared.domain.value_object.email import Email
+from shared.domain.value_object.int_value_object import IntValueObject
+from shared.domain.value_object.string_value_object import StringValueObject
+from shared.domain.value_object.uuid import Uuid
+from shared.domain.value_object.value_object import instance_state
+
+INSTANCES = 100_000
+
+_unslotted: Dict[type, type] = {}
+
+
+def unslotted(value: Any) -> Any:
+    """Copy of ``value`` (and of the dataclasses it holds) that keeps its
+    attributes in ``__dict__``"""
+    if not is_dataclass(value) or isinstance(value, type):
+        return value
+    cls = type(value)
+    state = instance_state(value)
+    # Include slots caching derived values (Email's normalized form) already
+    # computed; object.__getattribute__ does not compute the missing ones
+    for base in cls.__mro__:
+        for name in getattr(base, '__slots__', ()):
+            try:
+                state.setdefault(name, object.__getattribute__(value, name))
+            except AttributeError:
+                pass
+    if cls not in _unslotted:
+        _unslotted[cls] = make_dataclass(f"Unslotted{cls.__name__}", list(state))
+    return _unslotted[cls](**{name: unslotted(item) for name, item in state.items()})
+
+
+def bytes_per_instance(build: Callable[[int], Any]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    instances = [build(i) for i in range(INSTANCES)]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (allocated - sys.getsizeof(instances)) / INSTANCES
+
+
+def main() -> None:
+    # Values are built up front and shared, so only the instances are measured
+    now = datetime.utcnow()
+    ids = [f'{i:032x}' for i in range(INSTANCES)]
+    ids = [f'{i[:8]}-{i[8:12]}-{i[12:16]}-{i[16:20]}-{i[20:]}' for i in ids]
+    numbers = list(range(INSTANCES))
+    emails = [f'user{i}@example.com' for i in range(INSTANCES)]
+    cases: Dict[str, Callable[[int], Any]] = {
+        'DomainEvent': lambda i: DomainEvent(ids[i], now, ids[i]),
+        'StringValueObject': lambda i: StringValueObject(ids[i]),
+        'IntValueObject': lambda i: IntValueObject(numbers[i]),
+        'Uuid': lambda i: Uuid(ids[i]),
+        'Email': lambda i: Email(emails[i]),
+        'Filter (with VOs)': lambda i: Filter.from_values('name', '=', ids[i]),
+    }
+    print(f"{'':20s} {'__dict__':>10s} {'slots':>10s}")
+    for name, build in cases.items():
+        built = [build(i) for i in range(INSTANCES)]
+        before = bytes_per_instance(lambda i: unslotted(built[i]))
+        after = bytes_per_instance(build)
+        del built
+        print(f"{name:20s} {before:8.1f} B {after:8.1f} B")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,7 @@ from typing import Dict, Any, List, Optional
 from .filters import Filters
 from .order import Order
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Criteria:
     filters: Filters
     order: Order
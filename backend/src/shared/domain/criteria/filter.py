@@ -3,7 +3,7 @@ from .filter_field import FilterField
 from .filter_operator import FilterOperator
 from .filter_value import FilterValue
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Filter:
     field: FilterField
     operator: FilterOperator
@@ -1,4 +1,4 @@
 from ..value_object.string_value_object import StringValueObject
 
 class FilterField(StringValueObject):
-    pass
+    __slots__ = ()
@@ -1,6 +1,8 @@
 from ..value_object.string_value_object import StringValueObject
 
 class FilterValue(StringValueObject):
+    __slots__ = ()
+
     def is_null(self) -> bool:
         return self.value.lower() == 'null'
         
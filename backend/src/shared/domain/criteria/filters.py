@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import List, Dict, Any
 from .filter import Filter
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Filters:
     filters: List[Filter]
 
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from .order_by import OrderBy
 from .order_type import OrderType
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Order:
     order_by: OrderBy
     order_type: OrderType
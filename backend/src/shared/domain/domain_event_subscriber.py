@@ -1,13 +1,23 @@
 from abc import ABC, abstractmethod
-from typing import List, Type
+from typing import ClassVar, List, Type
 from .events import DomainEvent
 
 class DomainEventSubscriber(ABC):
+    # With batch_size > 1 the event bus groups events and calls on_batch with
+    # up to batch_size of them, waiting at most batch_window seconds
+    batch_size: ClassVar[int] = 1
+    batch_window: ClassVar[float] = 0.05
+
     @abstractmethod
     async def on(self, domain_event: DomainEvent) -> None:
         """Handle the domain event"""
         pass
 
+    async def on_batch(self, domain_events: List[DomainEvent]) -> None:
+        """Handle several events at once. Override to process them with fewer round-trips"""
+        for domain_event in domain_events:
+            await self.on(domain_event)
+
     @classmethod
     @abstractmethod
     def subscribed_to(cls) -> List[Type[DomainEvent]]:
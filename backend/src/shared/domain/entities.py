@@ -1,13 +1,49 @@
 from abc import ABC
 from datetime import datetime
-from typing import Any
+from typing import Any, FrozenSet
 from .value_objects import EntityId
 
 class Entity(ABC):
-    """Base class for all entities"""
+    """Base class for all entities.
+
+    Assigning a public attribute marks it as dirty, so repositories can
+    write only what changed since the entity was loaded or saved.
+    Lists, dicts and sets changed in place are found by comparing them with
+    the shallow copies taken by ``mark_clean``; objects changed in place
+    inside them, and other objects changed in place, are marked with
+    ``mark_dirty``. ``version`` is the row version used for
+    optimistic concurrency.
+    """
     id: EntityId
     created_at: datetime
     updated_at: datetime
+    version: int = 1
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if not name.startswith('_'):
+            self.__dict__.setdefault('_dirty_fields', set()).add(name)
+        super().__setattr__(name, value)
+
+    @property
+    def dirty_fields(self) -> FrozenSet[str]:
+        """Public attributes assigned or changed in place since the last ``mark_clean``"""
+        dirty = set(self.__dict__.get('_dirty_fields', ()))
+        for name, value in self.__dict__.get('_clean_containers', {}).items():
+            if name not in dirty and self.__dict__.get(name) != value:
+                dirty.add(name)
+        return frozenset(dirty)
+
+    def mark_dirty(self, *names: str) -> None:
+        self.__dict__.setdefault('_dirty_fields', set()).update(names)
+
+    def mark_clean(self) -> None:
+        self.__dict__['_dirty_fields'] = set()
+        # Shallow copies: entities are marked clean on every load and write,
+        # where deep copies of nested containers would cost more than the row
+        self.__dict__['_clean_containers'] = {
+            name: value.copy() for name, value in self.__dict__.items()
+            if not name.startswith('_') and isinstance(value, (list, dict, set))
+        }
 
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, Entity):
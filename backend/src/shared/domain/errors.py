@@ -41,6 +41,14 @@ class AlreadyExistsError(DomainError):
         super().__init__(message)
 
 
+class ConcurrencyError(DomainError):
+    """Error for when an entity was changed by someone else since it was loaded"""
+    ERROR_ID = "concurrency_conflict"
+    
+    def __init__(self, message: str):
+        super().__init__(message)
+
+
 class ValidationError(DomainError):
     """Error for validation failures in domain rules"""
     ERROR_ID = "validation_error"
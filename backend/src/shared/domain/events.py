@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Dict, Any
 from uuid import uuid4
 
-@dataclass
+@dataclass(slots=True)
 class DomainEvent(ABC):
     """Base class for domain events"""
     
@@ -21,6 +21,11 @@ class DomainEvent(ABC):
             **kwargs
         )
 
+    @classmethod
+    def from_primitives(cls, primitives: Dict[str, Any]) -> 'DomainEvent':
+        """Rebuild an event from ``to_primitives()``. Events with non-primitive attributes override it"""
+        return cls(**{**primitives, 'occurred_on': datetime.fromisoformat(primitives['occurred_on'])})
+
     def to_primitives(self) -> Dict[str, Any]:
         """Convert event to primitive types for serialization"""
         return {
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import TypeVar, Generic
+from datetime import timedelta
+from typing import ClassVar, Optional, Sequence, Type, TypeVar, Generic
+from .events import DomainEvent
 from .query import Query
 from .response import Response
 
@@ -7,7 +9,18 @@ Q = TypeVar('Q', bound=Query)
 R = TypeVar('R', bound=Response)
 
 class QueryHandler(Generic[Q, R], ABC):
+    # Opt-in response caching by the query bus: how long responses are kept
+    # and which domain events make them stale
+    cache_ttl: ClassVar[Optional[timedelta]] = None
+    invalidated_by: ClassVar[Sequence[Type[DomainEvent]]] = ()
+
     @abstractmethod
     async def handle(self, query: Q) -> R:
         """Handle a query and return its response"""
         pass
+
+    @classmethod
+    def cache_aggregate_id(cls, query: Q) -> Optional[str]:
+        """Aggregate the cached response belongs to. When set, only events with
+        this aggregate_id invalidate it; otherwise any invalidating event does"""
+        return None
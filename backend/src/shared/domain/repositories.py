@@ -35,3 +35,7 @@ class ReadRepository(Generic[T], ABC):
     async def list_all(self) -> List[T]:
         """List all aggregates"""
         pass
+
+class Repository(WriteRepository[T], ReadRepository[T]):
+    """Interface for read and write operations"""
+    pass
@@ -7,6 +7,7 @@ from .value_object import ValueObject
 
 class DateTime(ValueObject):
     """Value object for handling dates and times"""
+    __slots__ = ('_value',)
     
     def __init__(self, value: Union[str, dt, None] = None):
         """
@@ -18,16 +19,16 @@ class DateTime(ValueObject):
                 - datetime: Python datetime object
         """
         if value is None:
-            self._value = dt.utcnow()
+            value = dt.utcnow()
         elif isinstance(value, str):
             try:
-                self._value = dt.fromisoformat(value.replace('Z', '+00:00'))
+                value = dt.fromisoformat(value.replace('Z', '+00:00'))
             except ValueError as e:
                 raise InvalidArgumentError(f"Invalid datetime format: {str(e)}")
-        elif isinstance(value, dt):
-            self._value = value
-        else:
+        elif not isinstance(value, dt):
             raise InvalidArgumentError(f"Invalid datetime type: {type(value)}")
+        # ValueObject is frozen, attributes are set past its __setattr__
+        object.__setattr__(self, '_value', value)
     
     @property
     def value(self) -> dt:
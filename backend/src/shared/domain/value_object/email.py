@@ -2,30 +2,35 @@ import re
 from typing import Any
 
 from ..errors import InvalidArgumentError
-from .string_value_object import StringValueObject
+from .normalized_string_value_object import NormalizedStringValueObject
 
+# RFC 5322 compliant email regex
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
 
-class Email(StringValueObject):
+
+class Email(NormalizedStringValueObject):
     """Value object for email addresses"""
+    __slots__ = ()
     
     def __init__(self, value: str):
         self._ensure_valid_email(value)
         super().__init__(value)
     
+    @staticmethod
+    def normalize(value: str) -> str:
+        return value.lower()
+    
     @staticmethod
     def _ensure_valid_email(value: str) -> None:
         if not value:
             raise InvalidArgumentError("Email cannot be empty")
         
-        # RFC 5322 compliant email regex
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(pattern, value):
+        if not EMAIL_PATTERN.match(value):
             raise InvalidArgumentError(f"'{value}' is not a valid email")
     
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, Email):
             return False
-        return self.value.lower() == other.value.lower()
+        return self._normalized == other._normalized
     
-    def __hash__(self) -> int:
-        return hash(self.value.lower())
+    __hash__ = NormalizedStringValueObject.__hash__
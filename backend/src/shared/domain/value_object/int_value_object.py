@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from .value_object import ValueObject
 from .invalid_argument_error import InvalidArgumentError
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class IntValueObject(ValueObject):
     value: int
 
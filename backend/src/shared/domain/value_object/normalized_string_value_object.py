@@ -0,0 +1,56 @@
+from typing import Any, ClassVar, Dict
+from .string_value_object import StringValueObject
+
+_intern_tables: Dict[type, Dict[str, Any]] = {}
+
+
+class NormalizedStringValueObject(StringValueObject):
+    """String value object compared and hashed by a normalized form.
+
+    The normalized value and its hash are computed on first use and kept in
+    slots, so comparing and hashing the same instance again costs nothing.
+    Both are left out of ``instance_state`` (string hashes change between
+    processes) and rebuilt after unpickling or cache decoding.
+
+    ``interned`` returns a shared instance per raw input, skipping
+    validation for inputs seen before. Each class keeps at most
+    ``intern_size`` instances and evicts the oldest first.
+    """
+    __slots__ = ('_normalized', '_hash')
+    _derived_slots = ('_normalized', '_hash')
+    intern_size: ClassVar[int] = 4096
+
+    @staticmethod
+    def normalize(value: str) -> str:
+        return value
+
+    @property
+    def normalized(self) -> str:
+        return self._normalized
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called while a derived slot is still empty
+        if name == '_normalized':
+            value = self.normalize(self.value)
+        elif name == '_hash':
+            value = hash(self._normalized)
+        else:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        object.__setattr__(self, name, value)
+        return value
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    @classmethod
+    def interned(cls, value: str) -> 'NormalizedStringValueObject':
+        table = _intern_tables.get(cls)
+        if table is None:
+            table = _intern_tables[cls] = {}
+        instance = table.get(value)
+        if instance is None:
+            instance = cls(value)
+            if table and len(table) >= cls.intern_size:
+                table.pop(next(iter(table)), None)
+            table[value] = instance
+        return instance
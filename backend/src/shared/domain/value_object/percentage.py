@@ -7,10 +7,13 @@ from .value_object import ValueObject
 
 class Percentage(ValueObject):
     """Value object for percentage values"""
+    __slots__ = ('_value',)
     
     def __init__(self, value: Union[int, float, str, Decimal]):
-        self._value = self._to_decimal(value)
-        self._ensure_valid_percentage(self._value)
+        value = self._to_decimal(value)
+        self._ensure_valid_percentage(value)
+        # ValueObject is frozen, attributes are set past its __setattr__
+        object.__setattr__(self, '_value', value)
     
     @staticmethod
     def _to_decimal(value: Union[int, float, str, Decimal]) -> Decimal:
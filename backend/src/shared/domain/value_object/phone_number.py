@@ -2,17 +2,24 @@ import re
 from typing import Any
 
 from ..errors import InvalidArgumentError
-from .string_value_object import StringValueObject
+from .normalized_string_value_object import NormalizedStringValueObject
 
+PHONE_PATTERN = re.compile(r'^\+?\d+$')
 
-class PhoneNumber(StringValueObject):
+
+class PhoneNumber(NormalizedStringValueObject):
     """Value object for phone numbers in E.164 format"""
+    __slots__ = ()
     
     def __init__(self, value: str):
-        self._ensure_valid_phone(value)
+        if not value:
+            raise InvalidArgumentError("Phone number cannot be empty")
         # Store normalized format
         normalized = self._normalize_phone(value)
+        self._ensure_valid_phone(value, normalized)
         super().__init__(normalized)
+        # The stored value is already normalized
+        object.__setattr__(self, '_normalized', normalized)
     
     @staticmethod
     def _normalize_phone(value: str) -> str:
@@ -20,25 +27,20 @@ class PhoneNumber(StringValueObject):
         return '+' + ''.join(filter(str.isdigit, value)) if value.startswith('+') else ''.join(filter(str.isdigit, value))
     
     @staticmethod
-    def _ensure_valid_phone(value: str) -> None:
-        if not value:
-            raise InvalidArgumentError("Phone number cannot be empty")
-        
-        # Remove all non-digit characters except leading +
-        normalized = '+' + ''.join(filter(str.isdigit, value)) if value.startswith('+') else ''.join(filter(str.isdigit, value))
-        
+    def _ensure_valid_phone(value: str, normalized: str) -> None:
         # Basic validation: length between 8 and 15 digits (ITU-T E.164)
         if not 8 <= len(normalized.replace('+', '')) <= 15:
             raise InvalidArgumentError(f"'{value}' is not a valid phone number length")
         
         # Check if contains only digits (and optionally leading +)
-        if not re.match(r'^\+?\d+$', normalized):
+        if not PHONE_PATTERN.match(normalized):
             raise InvalidArgumentError(f"'{value}' contains invalid characters")
     
+    normalize = _normalize_phone
+    
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, PhoneNumber):
             return False
-        return self._normalize_phone(self.value) == self._normalize_phone(other.value)
+        return self._normalized == other._normalized
     
-    def __hash__(self) -> int:
-        return hash(self._normalize_phone(self.value))
+    __hash__ = NormalizedStringValueObject.__hash__
@@ -3,7 +3,7 @@ from ulid import ULID as ULIDLib
 from .string_value_object import StringValueObject
 from .invalid_argument_error import InvalidArgumentError
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Ulid(StringValueObject):
     def __post_init__(self):
         try:
@@ -2,11 +2,12 @@ from typing import Any
 from urllib.parse import urlparse
 
 from ..errors import InvalidArgumentError
-from .string_value_object import StringValueObject
+from .normalized_string_value_object import NormalizedStringValueObject
 
 
-class URL(StringValueObject):
+class URL(NormalizedStringValueObject):
     """Value object for URLs"""
+    __slots__ = ()
     
     ALLOWED_SCHEMES = {'http', 'https'}
     
@@ -41,11 +42,14 @@ class URL(StringValueObject):
         except Exception as e:
             raise InvalidArgumentError(f"Invalid URL format: {str(e)}")
     
+    @staticmethod
+    def normalize(value: str) -> str:
+        return urlparse(value).geturl()
+    
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, URL):
             return False
         # Normalize URLs for comparison
-        return urlparse(self.value).geturl() == urlparse(other.value).geturl()
+        return self._normalized == other._normalized
     
-    def __hash__(self) -> int:
-        return hash(urlparse(self.value).geturl())
+    __hash__ = NormalizedStringValueObject.__hash__
@@ -3,7 +3,7 @@ from uuid import UUID, uuid4
 from .string_value_object import StringValueObject
 from .invalid_argument_error import InvalidArgumentError
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Uuid(StringValueObject):
     def __post_init__(self):
         try:
@@ -1,14 +1,46 @@
 from abc import ABC
-from typing import Any
+from functools import lru_cache
+from typing import Any, Dict, Tuple
 from dataclasses import dataclass
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ValueObject(ABC):
     """Base class for all value objects.
     En Python usamos frozen=True para hacer los value objects inmutables,
-    similar al comportamiento en TypeScript."""
+    similar al comportamiento en TypeScript. slots=True evita el __dict__
+    por instancia; las subclases que no son dataclass declaran __slots__."""
     
     def equals(self, other: Any) -> bool:
         if not isinstance(other, self.__class__):
             return False
-        return self.__dict__ == other.__dict__
+        return instance_state(self) == instance_state(other)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The slots dataclass default only keeps fields, not slots such as DateTime._value
+        return instance_state(self)
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+
+@lru_cache(maxsize=None)
+def slot_names(cls: type) -> Tuple[str, ...]:
+    """Slots holding the state of ``cls`` instances, without ``_derived_slots``"""
+    skipped = {'__dict__', '__weakref__', *getattr(cls, '_derived_slots', ())}
+    names = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get('__slots__', ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name not in skipped and name not in names:
+                names.append(name)
+    return tuple(names)
+
+
+def instance_state(value: Any) -> Dict[str, Any]:
+    """Attributes of an instance, whether they live in slots or in __dict__.
+    Slots listed in the class ``_derived_slots`` only cache values computed
+    from the others and are left out"""
+    state = {name: getattr(value, name) for name in slot_names(type(value)) if hasattr(value, name)}
+    state.update(getattr(value, '__dict__', {}))
+    return state
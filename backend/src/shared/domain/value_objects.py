@@ -2,16 +2,17 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import NewType
 from ulid import ULID
+from .value_object.value_object import instance_state
 
 EntityId = NewType('EntityId', ULID)
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ValueObject:
     """Base class for value objects"""
     def equals(self, other: 'ValueObject') -> bool:
-        return isinstance(other, self.__class__) and self.__dict__ == other.__dict__
+        return isinstance(other, self.__class__) and instance_state(self) == instance_state(other)
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class StringValueObject(ValueObject):
     value: str
 
@@ -21,7 +22,7 @@ class StringValueObject(ValueObject):
         if not self.value:
             raise ValueError(f"{self.__class__.__name__} cannot be empty")
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DateTimeValueObject(ValueObject):
     value: datetime
 
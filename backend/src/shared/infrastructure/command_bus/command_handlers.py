@@ -1,16 +1,37 @@
-from typing import Dict, Type
+from typing import Dict, Optional, Type
 from ...domain.command import Command
 from ...domain.command_handler import CommandHandler
 
 class CommandHandlers:
     def __init__(self):
-        self._handlers: Dict[str, Type[CommandHandler]] = {}
+        self._handlers: Dict[Type[Command], Type[CommandHandler]] = {}
+        # Concrete command type -> handler, including subclasses of registered commands
+        self._resolved: Dict[type, Optional[Type[CommandHandler]]] = {}
 
     def register(self, command_class: Type[Command], handler: Type[CommandHandler]) -> None:
-        self._handlers[command_class.__name__] = handler
+        registered = self._handlers.get(command_class)
+        if registered is not None and registered is not handler:
+            raise ValueError(
+                f'Command {command_class.__module__}.{command_class.__qualname__} '
+                f'already has handler {registered.__qualname__}'
+            )
+        self._handlers[command_class] = handler
+        self._resolved.clear()
 
     def get(self, command: Command) -> Type[CommandHandler]:
-        handler = self._handlers.get(command.__class__.__name__)
+        command_class = type(command)
+        try:
+            handler = self._resolved[command_class]
+        except KeyError:
+            handler = self._resolved[command_class] = self._resolve(command_class)
         if not handler:
-            raise ValueError(f'No handler registered for command {command.__class__.__name__}')
+            raise ValueError(f'No handler registered for command {command_class.__name__}')
         return handler
+
+    def _resolve(self, command_class: type) -> Optional[Type[CommandHandler]]:
+        """Handler of the closest registered class in the MRO"""
+        for klass in command_class.__mro__:
+            handler = self._handlers.get(klass)
+            if handler is not None:
+                return handler
+        return None
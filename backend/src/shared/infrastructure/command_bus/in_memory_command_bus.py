@@ -1,17 +1,45 @@
-from typing import Type
+from typing import Dict, Optional, Sequence, Type
 from ...domain.command import Command
 from ...domain.command_bus import CommandBus
 from ...domain.command_handler import CommandHandler
+from ..dependency_injection.container import Container
+from ..middleware.middleware import Handle, Middleware, build_pipeline
 from .command_handlers import CommandHandlers
 
 class InMemoryCommandBus(CommandBus):
-    def __init__(self, command_handlers: CommandHandlers):
+    def __init__(
+        self,
+        command_handlers: CommandHandlers,
+        container: Optional[Container] = None,
+        middlewares: Sequence[Middleware] = ()
+    ):
         self._command_handlers = command_handlers
+        self._container = container
+        self._middlewares = list(middlewares)
+        self._pipelines: Dict[Type[Command], Handle] = {}
 
     async def dispatch(self, command: Command) -> None:
-        handler_class = self._command_handlers.get(command)
-        handler = handler_class()
-        await handler.handle(command)
+        pipeline = self._pipelines.get(type(command))
+        if pipeline is None:
+            pipeline = self._build_pipeline(type(command), self._command_handlers.get(command))
+        await pipeline(command)
 
     def register(self, command_class: Type[Command], handler: Type[CommandHandler]) -> None:
         self._command_handlers.register(command_class, handler)
+        # Subclasses may now resolve to a different handler
+        self._pipelines.clear()
+        self._build_pipeline(command_class, handler)
+
+    def _build_pipeline(self, command_class: Type[Command], handler_class: Type[CommandHandler]) -> Handle:
+        async def handle(command: Command) -> None:
+            await self._resolve(handler_class).handle(command)
+
+        pipeline = build_pipeline(self._middlewares, command_class, handler_class, handle)
+        self._pipelines[command_class] = pipeline
+        return pipeline
+
+    def _resolve(self, handler_class: Type[CommandHandler]) -> CommandHandler:
+        """Handlers not registered in the container are built for each message"""
+        if self._container is None:
+            return handler_class()
+        return self._container.resolve_or_register(handler_class)
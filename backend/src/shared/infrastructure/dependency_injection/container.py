@@ -0,0 +1,173 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from inspect import Parameter, signature
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Type, TypeVar, get_type_hints
+
+T = TypeVar('T')
+
+_UNSET = object()
+_current_scope: ContextVar[Optional[Dict[type, Any]]] = ContextVar('container_scope', default=None)
+
+
+class Lifetime(Enum):
+    SINGLETON = 'singleton'
+    SCOPED = 'scoped'
+    TRANSIENT = 'transient'
+
+
+class Container:
+    """Lightweight dependency injection container.
+
+    Each registration is compiled into a resolver closure, so ``resolve`` is
+    a dict lookup plus a call: singletons are built once, scoped services
+    once per ``scope()`` (e.g. per request or command) and transient ones
+    on every call. Without a factory, classes are autowired from the type
+    hints of their ``__init__`` the first time they are resolved. An
+    autowired singleton that depends, directly or through transient
+    services, on a scoped one raises ValueError instead of capturing the
+    instance of the first scope.
+    """
+
+    def __init__(self):
+        self._resolvers: Dict[type, Callable[[], Any]] = {}
+        self._lifetimes: Dict[type, Lifetime] = {}
+        self._autowired: Set[type] = set()
+
+    def register(
+        self,
+        service: Type[T],
+        factory: Optional[Callable[[], T]] = None,
+        lifetime: Lifetime = Lifetime.TRANSIENT
+    ) -> None:
+        create = factory or self._lazy_autowire(service, lifetime)
+        if lifetime is Lifetime.SINGLETON:
+            resolver = self._singleton(create)
+        elif lifetime is Lifetime.SCOPED:
+            resolver = self._scoped(service, create)
+        else:
+            resolver = create
+        self._resolvers[service] = resolver
+        self._lifetimes[service] = lifetime
+        if factory is None:
+            self._autowired.add(service)
+        else:
+            self._autowired.discard(service)
+
+    def register_instance(self, service: Type[T], instance: T) -> None:
+        self._resolvers[service] = lambda: instance
+        self._lifetimes[service] = Lifetime.SINGLETON
+        self._autowired.discard(service)
+
+    def has(self, service: type) -> bool:
+        return service in self._resolvers
+
+    def resolve(self, service: Type[T]) -> T:
+        resolver = self._resolvers.get(service)
+        if resolver is None:
+            raise ValueError(f'No provider registered for {service.__name__}')
+        return resolver()
+
+    def resolve_or_register(self, service: Type[T], lifetime: Lifetime = Lifetime.TRANSIENT) -> T:
+        """Resolve ``service``, registering it with ``lifetime`` on first use.
+        The default builds a new instance per call, so services holding a
+        session or repository are never shared between requests"""
+        resolver = self._resolvers.get(service)
+        if resolver is None:
+            self.register(service, lifetime=lifetime)
+            resolver = self._resolvers[service]
+        return resolver()
+
+    @contextmanager
+    def scope(self) -> Iterator[None]:
+        """Scope for SCOPED services. Tasks started inside share it"""
+        token = _current_scope.set({})
+        try:
+            yield
+        finally:
+            _current_scope.reset(token)
+
+    @staticmethod
+    def _singleton(create: Callable[[], T]) -> Callable[[], T]:
+        instance = _UNSET
+
+        def resolve() -> T:
+            nonlocal instance
+            if instance is _UNSET:
+                instance = create()
+            return instance
+
+        return resolve
+
+    @staticmethod
+    def _scoped(service: type, create: Callable[[], T]) -> Callable[[], T]:
+        def resolve() -> T:
+            scope = _current_scope.get()
+            if scope is None:
+                raise ValueError(f'{service.__name__} is scoped and must be resolved inside Container.scope()')
+            instance = scope.get(service, _UNSET)
+            if instance is _UNSET:
+                instance = scope[service] = create()
+            return instance
+
+        return resolve
+
+    def _lazy_autowire(self, service: type, lifetime: Lifetime) -> Callable[[], Any]:
+        """Inspect constructor dependencies on first use, once every service is registered"""
+        factory: Optional[Callable[[], Any]] = None
+
+        def create() -> Any:
+            nonlocal factory
+            if factory is None:
+                factory = self._autowire(service, lifetime)
+            return factory()
+
+        return create
+
+    def _autowire(self, service: type, lifetime: Lifetime) -> Callable[[], Any]:
+        dependencies = self._dependencies(service)
+        if lifetime is Lifetime.SINGLETON:
+            captive = self._scoped_dependency(service, set())
+            if captive is not None:
+                raise ValueError(
+                    f'Singleton {service.__name__} cannot depend on scoped {captive.__name__}'
+                )
+
+        if not dependencies:
+            return service
+        resolvers = self._resolvers
+        if len(dependencies) == 1:
+            (name, hint), = dependencies
+            return lambda: service(**{name: resolvers[hint]()})
+        return lambda: service(**{name: resolvers[hint]() for name, hint in dependencies})
+
+    def _scoped_dependency(self, service: type, seen: Set[type]) -> Optional[type]:
+        """Scoped service that ``service`` depends on, directly or through transient ones"""
+        seen.add(service)
+        for _, hint in self._dependencies(service):
+            lifetime = self._lifetimes.get(hint)
+            if lifetime is Lifetime.SCOPED:
+                return hint
+            if lifetime is Lifetime.TRANSIENT and hint in self._autowired and hint not in seen:
+                captive = self._scoped_dependency(hint, seen)
+                if captive is not None:
+                    return captive
+        return None
+
+    def _dependencies(self, service: type) -> List[Tuple[str, type]]:
+        """Constructor parameters resolved from the container"""
+        try:
+            hints = get_type_hints(service.__init__)
+        except (NameError, TypeError):
+            hints = {}
+
+        dependencies: List[Tuple[str, type]] = []
+        for name, parameter in signature(service).parameters.items():
+            if parameter.kind in (Parameter.VAR_POSITIONAL, Parameter.VAR_KEYWORD):
+                continue
+            hint = hints.get(name)
+            if hint in self._resolvers:
+                dependencies.append((name, hint))
+            elif parameter.default is Parameter.empty:
+                raise ValueError(f'Cannot resolve parameter {name} of {service.__name__}')
+        return dependencies
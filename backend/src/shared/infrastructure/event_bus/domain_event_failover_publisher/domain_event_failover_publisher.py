@@ -1,26 +1,65 @@
+import asyncio
 import json
 import os
-from datetime import datetime
-from typing import Dict, Any, List
+from concurrent.futures import Executor
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from ....domain.events import DomainEvent
-from ..domain_event_json_serializer import DomainEventJsonSerializer
+from ..domain_event_compiled_serializer import DomainEventCompiledSerializer
+from .segment_log import LogOffset, SegmentLog
 
 class DomainEventFailoverPublisher:
-    def __init__(self, failover_path: str = "failed_domain_events"):
+    """Stores events that could not be delivered so they can be retried.
+
+    Events go to an append-only ``SegmentLog`` in ``failover_path``, written
+    from ``executor`` (the loop's default one if not given) so the event
+    loop never blocks on disk. Publishes that arrive while a write is in
+    progress are written together with a single fsync.
+    """
+
+    def __init__(
+        self,
+        failover_path: str = "failed_domain_events",
+        segment_size: int = 64 * 1024 * 1024,
+        executor: Optional[Executor] = None
+    ):
         self.failover_path = failover_path
         os.makedirs(failover_path, exist_ok=True)
+        self._log = SegmentLog(failover_path, segment_size)
+        self._executor = executor
+        self._serializer = DomainEventCompiledSerializer()
+        self._pending: List[Tuple[bytes, asyncio.Future]] = []
+        self._writer: Optional[asyncio.Task] = None
+
+    async def publish(self, domain_event: DomainEvent, subscriber: Optional[str] = None) -> None:
+        """Store a failed event. ``subscriber`` names the only subscriber that
+        has to retry it; without it every subscriber gets the event again"""
+        meta = {'subscriber': subscriber} if subscriber is not None else None
+        await self._append(self._serializer.serialize(domain_event, meta))
 
-    async def publish(self, domain_event: DomainEvent) -> None:
-        event_json = DomainEventJsonSerializer.serialize(domain_event)
-        file_name = f"{datetime.now().isoformat()}-{domain_event.event_id}.json"
-        file_path = os.path.join(self.failover_path, file_name)
-        
-        with open(file_path, 'w') as f:
-            json.dump(event_json, f)
+    async def store(self, event_json: Dict[str, Any]) -> None:
+        """Store an already serialized event, e.g. one moved to a dead-letter store"""
+        await self._append(self._serializer.dumps(event_json))
+
+    async def stream_failed_events(self, batch_size: int = 100) -> AsyncIterator[Tuple[LogOffset, Dict[str, Any]]]:
+        """Yield stored events in order, starting after the last ``commit``.
+        Each event comes with the offset to commit once it has been handled"""
+        loop = asyncio.get_running_loop()
+        offset = await loop.run_in_executor(self._executor, self._log.checkpoint)
+        while True:
+            records = await loop.run_in_executor(self._executor, self._log.read, offset, batch_size)
+            if not records:
+                return
+            for offset, record in records:
+                yield offset, self._serializer.loads(record)
+
+    async def commit(self, offset: LogOffset) -> None:
+        """Mark every event up to ``offset`` as handled"""
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._log.commit, offset)
 
     def consume_failed_events(self) -> List[Dict[str, Any]]:
         failed_events = []
-        
+
+        # Events stored one file each before the segment log
         for file_name in os.listdir(self.failover_path):
             if file_name.endswith('.json'):
                 file_path = os.path.join(self.failover_path, file_name)
@@ -28,5 +67,39 @@ class DomainEventFailoverPublisher:
                     event_json = json.load(f)
                     failed_events.append(event_json)
                 os.remove(file_path)
-        
+
+        offset = self._log.checkpoint()
+        while True:
+            records = self._log.read(offset, 1000)
+            if not records:
+                break
+            for offset, record in records:
+                failed_events.append(self._serializer.loads(record))
+        self._log.commit(offset)
+
         return failed_events
+
+    def close(self) -> None:
+        self._log.close()
+
+    async def _append(self, record: bytes) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((record, future))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_pending())
+        await future
+
+    async def _write_pending(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                await loop.run_in_executor(self._executor, self._log.append, [record for record, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
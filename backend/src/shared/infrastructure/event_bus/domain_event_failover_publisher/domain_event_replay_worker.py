@@ -0,0 +1,188 @@
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional, Tuple
+import asyncio
+import logging
+import random
+import time
+
+from ..domain_event_registry import DomainEventRegistry
+from ..in_memory.in_memory_async_event_bus import InMemoryAsyncEventBus
+from .domain_event_failover_publisher import DomainEventFailoverPublisher
+from .segment_log import LogOffset
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReplayMetrics:
+    """Counters of a replay worker. ``lag_seconds`` is the age of the last event taken from the log"""
+    replayed: int = 0
+    retried: int = 0
+    dead_lettered: int = 0
+    in_flight: int = 0
+    lag_seconds: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def events_per_second(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+        return (self.replayed + self.dead_lettered) / elapsed if elapsed > 0 else 0.0
+
+    def to_primitives(self) -> Dict[str, Any]:
+        return {
+            'replayed': self.replayed,
+            'retried': self.retried,
+            'dead_lettered': self.dead_lettered,
+            'in_flight': self.in_flight,
+            'lag_seconds': self.lag_seconds,
+            'events_per_second': self.events_per_second
+        }
+
+
+class DomainEventReplayWorker:
+    """Replays the events stored by a ``DomainEventFailoverPublisher``.
+
+    Events are rebuilt through the ``registry`` and delivered again with
+    ``InMemoryAsyncEventBus.deliver``, only to the subscriber that failed
+    when the failover record names one. At most ``concurrency`` deliveries
+    run at once. A failed delivery is retried in place with exponential
+    backoff and full jitter; once an event has failed ``max_attempts``
+    times, counting the original delivery, or cannot be rebuilt, it is
+    moved to the ``dead_letter`` store with its attempts and last error.
+    The failover checkpoint only advances past events that are done, every
+    ``commit_every`` events, so a restart replays whatever was in flight.
+    """
+
+    def __init__(
+        self,
+        failover_publisher: DomainEventFailoverPublisher,
+        event_bus: InMemoryAsyncEventBus,
+        registry: DomainEventRegistry,
+        dead_letter: DomainEventFailoverPublisher,
+        max_attempts: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        concurrency: int = 10,
+        max_in_flight: int = 1000,
+        commit_every: int = 100,
+        poll_interval: float = 5.0
+    ):
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be at least 1')
+        self._failover = failover_publisher
+        self._event_bus = event_bus
+        self._registry = registry
+        self._dead_letter = dead_letter
+        self._max_attempts = max_attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._max_in_flight = max_in_flight
+        self._commit_every = commit_every
+        self._poll_interval = poll_interval
+        self._task: Optional[asyncio.Task] = None
+        self.metrics = ReplayMetrics()
+
+    async def start(self) -> None:
+        """Replay stored events in a background task, polling for new ones"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop replaying. Events in flight are replayed again on the next start"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def replay_once(self) -> int:
+        """Replay every stored event. Returns how many were replayed or dead-lettered"""
+        in_flight: Deque[Tuple[LogOffset, asyncio.Task]] = deque()
+        handled = 0
+        committed = 0
+        offset: Optional[LogOffset] = None
+        try:
+            async for record_offset, event_json in self._failover.stream_failed_events(self._commit_every):
+                in_flight.append((record_offset, asyncio.create_task(self._replay(event_json))))
+                if len(in_flight) >= self._max_in_flight:
+                    await asyncio.wait([in_flight[0][1]])
+                # The checkpoint only moves past the longest run of finished events
+                while in_flight and in_flight[0][1].done():
+                    offset = self._pop_finished(in_flight)
+                    handled += 1
+                if handled - committed >= self._commit_every:
+                    await self._failover.commit(offset)
+                    committed = handled
+            if in_flight:
+                await asyncio.wait([task for _, task in in_flight])
+            while in_flight:
+                offset = self._pop_finished(in_flight)
+                handled += 1
+        finally:
+            # On errors, keep what finished before the first unfinished event
+            if handled > committed:
+                await self._failover.commit(offset)
+            for _, task in in_flight:
+                task.cancel()
+        return handled
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.replay_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed event replay failed: {str(e)}")
+            await asyncio.sleep(self._poll_interval)
+
+    @staticmethod
+    def _pop_finished(in_flight: Deque[Tuple[LogOffset, asyncio.Task]]) -> LogOffset:
+        """Offset of the finished head event, raising instead if its replay crashed"""
+        offset, task = in_flight[0]
+        task.result()
+        in_flight.popleft()
+        return offset
+
+    async def _replay(self, event_json: Dict[str, Any]) -> None:
+        meta = event_json.setdefault('meta', {})
+        attempts = meta.get('attempts', 1)
+        self.metrics.in_flight += 1
+        try:
+            try:
+                event = self._registry.deserialize(event_json)
+            except Exception as e:
+                await self._to_dead_letter(event_json, attempts, e)
+                return
+            self.metrics.lag_seconds = (datetime.utcnow() - event.occurred_on).total_seconds()
+
+            while True:
+                try:
+                    async with self._semaphore:
+                        await self._event_bus.deliver(event, meta.get('subscriber'))
+                    self.metrics.replayed += 1
+                    return
+                except Exception as e:
+                    attempts += 1
+                    if attempts >= self._max_attempts:
+                        await self._to_dead_letter(event_json, attempts, e)
+                        return
+                    self.metrics.retried += 1
+                    await asyncio.sleep(self._backoff(attempts))
+        finally:
+            self.metrics.in_flight -= 1
+
+    async def _to_dead_letter(self, event_json: Dict[str, Any], attempts: int, error: Exception) -> None:
+        logger.error(f"Moving event {event_json.get('data', {}).get('id')} to dead letter: {error!r}")
+        event_json['meta']['attempts'] = attempts
+        event_json['meta']['error'] = repr(error)
+        await self._dead_letter.store(event_json)
+        self.metrics.dead_lettered += 1
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self._max_delay, self._base_delay * 2 ** (attempt - 1)))
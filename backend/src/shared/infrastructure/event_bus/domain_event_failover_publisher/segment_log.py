@@ -0,0 +1,194 @@
+from typing import BinaryIO, List, NamedTuple, Optional, Sequence, Tuple
+import logging
+import os
+import struct
+import threading
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# <payload length><crc32 of payload>
+RECORD_HEADER = struct.Struct('>II')
+SEGMENT_SUFFIX = '.log'
+CORRUPT_SUFFIX = '.corrupt'
+CHECKPOINT_FILE = 'checkpoint'
+
+
+class LogOffset(NamedTuple):
+    """Position in the log: segment number and byte offset inside it"""
+    segment: int
+    position: int
+
+
+class SegmentLog:
+    """Append-only log of binary records split into numbered segment files.
+
+    Records are stored as ``<length><crc32><payload>``. ``append`` writes a
+    whole batch with one fsync and starts a new segment once the current
+    one reaches ``segment_size`` bytes. Readers stop at the first
+    incomplete record of the active segment, and a torn write left by a
+    crash is truncated when the log is opened. A complete record whose
+    checksum does not match is logged and skipped. Unreadable bytes at the
+    end of a finished segment, and torn writes, are copied to a
+    ``.corrupt`` file next to the segments before readers move past them,
+    so corruption never loses data silently. Consumers save their progress
+    with ``commit``, which also deletes the segments they have finished.
+
+    All methods block on disk I/O; async code calls them from an executor.
+    A log directory must only be written by one process.
+    """
+
+    def __init__(self, directory: str, segment_size: int = 64 * 1024 * 1024, fsync: bool = True):
+        self._directory = directory
+        self._segment_size = segment_size
+        self._fsync = fsync
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        segments = self.segments()
+        self._active_segment = segments[-1] if segments else 0
+        self._active_size = self._recover(self._active_segment)
+        self._active: Optional[BinaryIO] = open(self._segment_path(self._active_segment), 'ab')
+
+    def segments(self) -> List[int]:
+        """Numbers of the segment files on disk, oldest first"""
+        return sorted(
+            int(name[:-len(SEGMENT_SUFFIX)]) for name in os.listdir(self._directory)
+            if name.endswith(SEGMENT_SUFFIX) and name[:-len(SEGMENT_SUFFIX)].isdigit()
+        )
+
+    def append(self, records: Sequence[bytes]) -> LogOffset:
+        """Write records durably. Returns the offset after the last one"""
+        with self._lock:
+            for record in records:
+                if self._active_size >= self._segment_size:
+                    self._rotate()
+                self._active.write(RECORD_HEADER.pack(len(record), zlib.crc32(record)))
+                self._active.write(record)
+                self._active_size += RECORD_HEADER.size + len(record)
+            self._active.flush()
+            if self._fsync:
+                os.fsync(self._active.fileno())
+            return LogOffset(self._active_segment, self._active_size)
+
+    def read(self, offset: LogOffset, max_records: int) -> List[Tuple[LogOffset, bytes]]:
+        """Read up to ``max_records`` records starting at ``offset``. Each one
+        comes with the offset right after it, to resume or commit from"""
+        records: List[Tuple[LogOffset, bytes]] = []
+        segments = [segment for segment in self.segments() if segment >= offset.segment]
+        for segment in segments:
+            position = offset.position if segment == offset.segment else 0
+            path = self._segment_path(segment)
+            with open(path, 'rb') as f:
+                f.seek(position)
+                while len(records) < max_records:
+                    record, size = self._read_record(f)
+                    if size == 0:
+                        break
+                    position += size
+                    if record is None:
+                        logger.error(f"Skipping corrupt record at {path}:{position - size}")
+                        continue
+                    records.append((LogOffset(segment, position), record))
+            if len(records) >= max_records:
+                break
+            if segment < self._active_segment and position < os.path.getsize(path):
+                # Finished segments end with a complete record, so the rest
+                # cannot be read; keep it before moving to the next segment
+                self._quarantine(segment, position)
+        return records
+
+    def checkpoint(self) -> LogOffset:
+        """Offset saved by the last ``commit``, or the start of the log"""
+        try:
+            with open(os.path.join(self._directory, CHECKPOINT_FILE)) as f:
+                segment, position = f.read().split()
+                return LogOffset(int(segment), int(position))
+        except FileNotFoundError:
+            segments = self.segments()
+            return LogOffset(segments[0] if segments else 0, 0)
+
+    def commit(self, offset: LogOffset) -> None:
+        """Save ``offset`` as consumed and delete the segments before it"""
+        path = os.path.join(self._directory, CHECKPOINT_FILE)
+        with open(f"{path}.tmp", 'w') as f:
+            f.write(f"{offset.segment} {offset.position}")
+            f.flush()
+            if self._fsync:
+                os.fsync(f.fileno())
+        os.replace(f"{path}.tmp", path)
+
+        with self._lock:
+            for segment in self.segments():
+                if segment < offset.segment and segment != self._active_segment:
+                    os.remove(self._segment_path(segment))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._active is not None:
+                self._active.close()
+                self._active = None
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self._directory, f"{segment:020d}{SEGMENT_SUFFIX}")
+
+    def _rotate(self) -> None:
+        self._active.flush()
+        if self._fsync:
+            os.fsync(self._active.fileno())
+        self._active.close()
+        self._active_segment += 1
+        self._active_size = 0
+        self._active = open(self._segment_path(self._active_segment), 'ab')
+
+    def _recover(self, segment: int) -> int:
+        """Size of the valid part of a segment, truncating a torn last record.
+        Corrupt records followed by valid data are kept for readers to skip"""
+        path = self._segment_path(segment)
+        if not os.path.exists(path):
+            return 0
+        position = 0
+        with open(path, 'rb') as f:
+            while True:
+                record, size = self._read_record(f)
+                if size == 0:
+                    break
+                if record is None:
+                    logger.error(f"Corrupt record at {path}:{position}")
+                position += size
+        if position != os.path.getsize(path):
+            self._quarantine(segment, position)
+            logger.warning(f"Truncating torn record at {path}:{position}")
+            with open(path, 'r+b') as f:
+                f.truncate(position)
+        return position
+
+    def _quarantine(self, segment: int, position: int) -> None:
+        """Copy the unreadable end of a segment, from ``position``, to a ``.corrupt`` file"""
+        path = self._segment_path(segment)
+        quarantine_path = os.path.join(self._directory, f"{segment:020d}.{position}{CORRUPT_SUFFIX}")
+        if os.path.exists(quarantine_path):
+            return
+        with open(path, 'rb') as source, open(quarantine_path, 'wb') as target:
+            source.seek(position)
+            target.write(source.read())
+        logger.error(
+            f"Unreadable data at {path}:{position} ({os.path.getsize(quarantine_path)} bytes) "
+            f"copied to {quarantine_path}"
+        )
+
+    @staticmethod
+    def _read_record(f: BinaryIO) -> Tuple[Optional[bytes], int]:
+        """Next record and its size on disk. Returns ``(None, 0)`` at the end
+        of the data or at an incomplete record, and ``(None, size)`` for a
+        complete record whose checksum does not match"""
+        header = f.read(RECORD_HEADER.size)
+        if len(header) < RECORD_HEADER.size:
+            return None, 0
+        length, checksum = RECORD_HEADER.unpack(header)
+        record = f.read(length)
+        if len(record) < length:
+            return None, 0
+        if zlib.crc32(record) != checksum:
+            return None, RECORD_HEADER.size + length
+        return record, RECORD_HEADER.size + length
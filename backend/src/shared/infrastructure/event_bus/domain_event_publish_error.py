@@ -0,0 +1,25 @@
+from dataclasses import dataclass
+from typing import List, Type
+from ...domain.events import DomainEvent
+from ...domain.domain_event_subscriber import DomainEventSubscriber
+
+
+@dataclass(frozen=True)
+class SubscriberFailure:
+    """A subscriber that failed to handle an event"""
+    event: DomainEvent
+    subscriber: Type[DomainEventSubscriber]
+    error: BaseException
+
+
+class DomainEventPublishError(Exception):
+    """Raised after every subscriber ran when some of them failed.
+    Each failed (event, subscriber) pair has already been sent to failover"""
+
+    def __init__(self, failures: List[SubscriberFailure]):
+        self.failures = failures
+        details = ', '.join(
+            f"{failure.subscriber.__name__} on {type(failure.event).__name__}: {failure.error!r}"
+            for failure in failures
+        )
+        super().__init__(f"{len(failures)} subscriber(s) failed: {details}")
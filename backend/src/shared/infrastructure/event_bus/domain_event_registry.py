@@ -0,0 +1,38 @@
+from typing import Any, Dict, List, Optional, Type
+from ...domain.events import DomainEvent
+from .domain_event_schema import DomainEventSchema
+
+
+class DomainEventRegistry:
+    """Maps the event types written by ``DomainEventJsonSerializer`` back to event classes"""
+
+    def __init__(self, event_classes: Optional[List[Type[DomainEvent]]] = None):
+        self._event_classes: Dict[str, Type[DomainEvent]] = {}
+        for event_class in event_classes or []:
+            self.register(event_class)
+
+    def register(self, event_class: Type[DomainEvent]) -> None:
+        name = event_class.__name__
+        registered = self._event_classes.get(name)
+        if registered is not None and registered is not event_class:
+            raise ValueError(
+                f"Event type {name} is already registered as {registered.__module__}.{registered.__qualname__}"
+            )
+        self._event_classes[name] = event_class
+
+    def register_subclasses(self, base: Type[DomainEvent] = DomainEvent) -> None:
+        """Register every imported subclass of ``base``"""
+        for event_class in base.__subclasses__():
+            self.register(event_class)
+            self.register_subclasses(event_class)
+
+    def get(self, name: str) -> Type[DomainEvent]:
+        try:
+            return self._event_classes[name]
+        except KeyError:
+            raise ValueError(f"Unknown event type {name}") from None
+
+    def deserialize(self, event_json: Dict[str, Any]) -> DomainEvent:
+        """Rebuild an event from the output of ``DomainEventJsonSerializer.serialize``"""
+        data = event_json['data']
+        return DomainEventSchema.of(self.get(data['type'])).decode(data['attributes'])
@@ -0,0 +1,217 @@
+from dataclasses import MISSING, fields, is_dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, get_args, get_origin, get_type_hints
+from uuid import UUID
+from ...domain.events import DomainEvent
+from ...domain.value_object.value_object import slot_names
+
+Converter = Optional[Callable[[Any], Any]]
+
+# Types JSON keeps as they are, so their fields need no conversion at all
+_PRIMITIVES = (str, int, float, bool, type(None), Any)
+
+# Types orjson writes itself, in the same format as the converters below
+NATIVE_TYPES = (datetime, date, UUID, Enum)
+
+
+class DomainEventSchema:
+    """Field plan of an event class, compiled once from its type hints.
+
+    ``encode`` turns an event into its ``attributes`` dict and ``decode``
+    rebuilds the event from it. Only fields whose type JSON cannot keep get
+    a converter, so fields of plain types are copied as they are;
+    ``encode_native`` also leaves the types in ``NATIVE_TYPES`` to encoders
+    such as orjson that write them in the same format. Classes that
+    override ``to_primitives`` keep their own format and are rebuilt with
+    ``from_primitives``. Value objects with a ``to_primitives`` (such as
+    ``DateTime``) are stored as its result and rebuilt by their constructor;
+    other nested dataclasses as a dict of their fields. Payloads missing a
+    required field, e.g. written before the field existed, raise ValueError.
+    """
+
+    _schemas: Dict[type, 'DomainEventSchema'] = {}
+
+    def __init__(self, event_class: type):
+        self.event_class = event_class
+        self.type_name = event_class.__name__
+        self.custom = event_class.to_primitives is not DomainEvent.to_primitives
+        hints = get_type_hints(event_class)
+        init_fields = [field for field in fields(event_class) if field.init]
+        names = [field.name for field in init_fields]
+        self.field_names = frozenset(names)
+        self._required = frozenset(
+            field.name for field in init_fields
+            if field.default is MISSING and field.default_factory is MISSING
+        )
+        self._names = tuple(names)
+        self._getter = attrgetter(*names)
+        self._encoders = _encoder_plan(names, hints, ())
+        self._native_encoders = _encoder_plan(names, hints, NATIVE_TYPES)
+        self._decoders = [
+            (name, decoder) for name in names
+            for decoder in (_decoder(hints.get(name, Any)),) if decoder is not None
+        ]
+
+    @classmethod
+    def of(cls, event_class: type) -> 'DomainEventSchema':
+        schema = cls._schemas.get(event_class)
+        if schema is None:
+            schema = cls._schemas[event_class] = cls(event_class)
+        return schema
+
+    def encode(self, event: DomainEvent) -> Dict[str, Any]:
+        return self._encode(event, self._encoders)
+
+    def encode_native(self, event: DomainEvent) -> Dict[str, Any]:
+        return self._encode(event, self._native_encoders)
+
+    def _encode(self, event: DomainEvent, encoders: List[Tuple[str, Callable[[Any], Any]]]) -> Dict[str, Any]:
+        if self.custom:
+            return event.to_primitives()
+        attributes = dict(zip(self._names, self._getter(event)))
+        for name, encode in encoders:
+            value = attributes[name]
+            if value is not None:
+                attributes[name] = encode(value)
+        return attributes
+
+    def decode(self, attributes: Dict[str, Any]) -> DomainEvent:
+        if self.custom:
+            return self.event_class.from_primitives(attributes)
+        if attributes.keys() <= self.field_names:
+            kwargs = dict(attributes)
+        else:
+            kwargs = {name: value for name, value in attributes.items() if name in self.field_names}
+        for name, decode in self._decoders:
+            value = kwargs.get(name)
+            if value is not None:
+                kwargs[name] = decode(value)
+        if not self._required <= kwargs.keys():
+            missing = ', '.join(sorted(self._required - kwargs.keys()))
+            raise ValueError(f"{self.type_name} payload has no {missing}")
+        return self.event_class(**kwargs)
+
+
+def _optional_inner(hint: Any) -> Any:
+    """``X`` for ``Optional[X]``, the hint itself otherwise"""
+    if get_origin(hint) is Union:
+        args = [arg for arg in get_args(hint) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return hint
+
+
+def _encoder_plan(names: List[str], hints: Dict[str, Any], native: Tuple[type, ...]) -> List[Tuple[str, Callable[[Any], Any]]]:
+    return [
+        (name, encoder) for name in names
+        for encoder in (_encoder(hints.get(name, Any), native),) if encoder is not None
+    ]
+
+
+def _encoder(hint: Any, native: Tuple[type, ...] = ()) -> Converter:
+    hint = _optional_inner(hint)
+    origin = get_origin(hint)
+    if hint in _PRIMITIVES:
+        return None
+    if isinstance(hint, type) and issubclass(hint, native):
+        return None
+    if isinstance(hint, type) and issubclass(hint, (datetime, date)):
+        return lambda value: value.isoformat()
+    if hint in (Decimal, UUID):
+        return str
+    if isinstance(hint, type) and issubclass(hint, Enum):
+        return lambda value: value.value
+    if isinstance(hint, type) and _has_primitives(hint):
+        return lambda value: value.to_primitives()
+    if isinstance(hint, type) and is_dataclass(hint):
+        return _dataclass_encoder(hint, native)
+    if origin in (list, tuple, set, frozenset):
+        args = [arg for arg in get_args(hint) if arg is not Ellipsis]
+        item_encoder = _encoder(args[0], native) if len(args) == 1 else None
+        if item_encoder is None:
+            return None if origin in (list, tuple) else list
+        return lambda value: [None if item is None else item_encoder(item) for item in value]
+    if origin is dict:
+        args = get_args(hint)
+        value_encoder = _encoder(args[1], native) if len(args) == 2 else None
+        if value_encoder is None:
+            return None
+        return lambda value: {key: None if item is None else value_encoder(item) for key, item in value.items()}
+    return None
+
+
+def _decoder(hint: Any) -> Converter:
+    hint = _optional_inner(hint)
+    origin = get_origin(hint)
+    if hint in _PRIMITIVES:
+        return None
+    if isinstance(hint, type) and issubclass(hint, datetime):
+        return datetime.fromisoformat
+    if isinstance(hint, type) and issubclass(hint, date):
+        return date.fromisoformat
+    if hint in (Decimal, UUID):
+        return hint
+    if isinstance(hint, type) and issubclass(hint, Enum):
+        return hint
+    if isinstance(hint, type) and _has_primitives(hint):
+        return hint
+    if isinstance(hint, type) and is_dataclass(hint):
+        return _dataclass_decoder(hint)
+    if origin in (list, tuple, set, frozenset):
+        args = [arg for arg in get_args(hint) if arg is not Ellipsis]
+        item_decoder = _decoder(args[0]) if len(args) == 1 else None
+        if item_decoder is None:
+            return origin if origin is not list else None
+        return lambda value: origin(None if item is None else item_decoder(item) for item in value)
+    if origin is dict:
+        args = get_args(hint)
+        value_decoder = _decoder(args[1]) if len(args) == 2 else None
+        if value_decoder is None:
+            return None
+        return lambda value: {key: None if item is None else value_decoder(item) for key, item in value.items()}
+    return None
+
+
+def _has_primitives(cls: type) -> bool:
+    """Value objects converting themselves, rebuilt with ``cls(primitives)``"""
+    return callable(getattr(cls, 'to_primitives', None)) and not issubclass(cls, DomainEvent)
+
+
+def _dataclass_encoder(cls: type, native: Tuple[type, ...]) -> Callable[[Any], Dict[str, Any]]:
+    """Nested dataclasses such as value objects are stored as a dict of their fields"""
+    hidden = set(slot_names(cls)) - {field.name for field in fields(cls) if field.init}
+    if hidden:
+        # Their constructor could not restore it, so the value would silently change
+        raise TypeError(
+            f"{cls.__name__} keeps {', '.join(sorted(hidden))} outside its fields; "
+            f"give it a to_primitives() its constructor accepts"
+        )
+    hints = get_type_hints(cls)
+    plan = [(field.name, _encoder(hints.get(field.name, Any), native)) for field in fields(cls) if field.init]
+
+    def encode(value: Any) -> Dict[str, Any]:
+        encoded = {}
+        for name, encode_field in plan:
+            item = getattr(value, name)
+            encoded[name] = item if encode_field is None or item is None else encode_field(item)
+        return encoded
+
+    return encode
+
+
+def _dataclass_decoder(cls: type) -> Callable[[Dict[str, Any]], Any]:
+    hints = get_type_hints(cls)
+    plan = [(field.name, _decoder(hints.get(field.name, Any))) for field in fields(cls) if field.init]
+
+    def decode(value: Dict[str, Any]) -> Any:
+        kwargs = {}
+        for name, decode_field in plan:
+            if name in value:
+                item = value[name]
+                kwargs[name] = item if decode_field is None or item is None else decode_field(item)
+        return cls(**kwargs)
+
+    return decode
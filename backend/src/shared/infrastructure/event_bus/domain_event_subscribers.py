@@ -1,19 +1,47 @@
-from typing import Dict, List, Type
+from typing import Dict, FrozenSet, List, Tuple, Type
 from ...domain.events import DomainEvent
 from ...domain.domain_event_subscriber import DomainEventSubscriber
 
 class DomainEventSubscribers:
     def __init__(self, subscribers: List[Type[DomainEventSubscriber]]):
         self.subscribers = subscribers
+        self._subscriptions: Dict[Type[DomainEventSubscriber], FrozenSet[type]] = {
+            subscriber: frozenset(subscriber.subscribed_to()) for subscriber in subscribers
+        }
+        # Concrete event type -> subscribers, filled on first publish of each type
+        self._index: Dict[type, Tuple[Type[DomainEventSubscriber], ...]] = {}
 
     def items(self) -> List[Type[DomainEventSubscriber]]:
         return self.subscribers
 
-    def get_by_event(self, event_class: Type[DomainEvent]) -> List[Type[DomainEventSubscriber]]:
-        return [
-            subscriber for subscriber in self.subscribers
-            if event_class.__name__ in [event.__name__ for event in subscriber.subscribed_to()]
-        ]
+    def get_by_event(self, event_class: Type[DomainEvent]) -> Tuple[Type[DomainEventSubscriber], ...]:
+        """Subscribers of ``event_class`` or any of its parent classes, in registration order"""
+        try:
+            return self._index[event_class]
+        except KeyError:
+            subscribers = self._index[event_class] = self._resolve(event_class)
+            return subscribers
 
     def register(self, subscriber: Type[DomainEventSubscriber]) -> None:
         self.subscribers.append(subscriber)
+        self._subscriptions[subscriber] = frozenset(subscriber.subscribed_to())
+        self._index.clear()
+
+    def unregister(self, subscriber: Type[DomainEventSubscriber]) -> None:
+        self.subscribers.remove(subscriber)
+        del self._subscriptions[subscriber]
+        self._index.clear()
+
+    def refresh(self) -> None:
+        """Re-read ``subscribed_to()`` of every subscriber, e.g. after their subscriptions change"""
+        self._subscriptions = {
+            subscriber: frozenset(subscriber.subscribed_to()) for subscriber in self.subscribers
+        }
+        self._index.clear()
+
+    def _resolve(self, event_class: type) -> Tuple[Type[DomainEventSubscriber], ...]:
+        hierarchy = frozenset(event_class.__mro__)
+        return tuple(
+            subscriber for subscriber in self.subscribers
+            if not hierarchy.isdisjoint(self._subscriptions[subscriber])
+        )
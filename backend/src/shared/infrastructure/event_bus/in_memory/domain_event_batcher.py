@@ -0,0 +1,67 @@
+from typing import Awaitable, Callable, List, Optional, Set
+import asyncio
+from ....domain.events import DomainEvent
+
+
+class DomainEventBatcher:
+    """Groups the events of one subscriber into micro-batches.
+
+    A batch is handed to ``handle`` as soon as it holds ``max_size`` events
+    or ``max_delay`` seconds after its first event, whichever comes first,
+    so events from concurrent publishes share a batch. ``add`` returns a
+    future that resolves once the batch containing the event was handled.
+    """
+
+    def __init__(
+        self,
+        handle: Callable[[List[DomainEvent]], Awaitable[None]],
+        max_size: int,
+        max_delay: float
+    ):
+        if max_size <= 0:
+            raise ValueError('max_size must be greater than zero')
+        self._handle = handle
+        self._max_size = max_size
+        self._max_delay = max_delay
+        self._events: List[DomainEvent] = []
+        self._future: Optional[asyncio.Future] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def add(self, event: DomainEvent) -> asyncio.Future:
+        if self._future is None:
+            loop = asyncio.get_running_loop()
+            self._future = loop.create_future()
+            self._timer = loop.call_later(self._max_delay, self._flush)
+        future = self._future
+        self._events.append(event)
+        if len(self._events) >= self._max_size:
+            self._flush()
+        return future
+
+    def _flush(self) -> None:
+        if self._future is None:
+            return
+        self._timer.cancel()
+        events, future = self._events, self._future
+        self._events, self._future, self._timer = [], None, None
+        task = asyncio.ensure_future(self._run(events, future))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        # A task cancelled before it starts never runs _run
+        task.add_done_callback(lambda _: future.cancel())
+
+    async def _run(self, events: List[DomainEvent], future: asyncio.Future) -> None:
+        try:
+            await self._handle(events)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(None)
+        finally:
+            # Publishers awaiting the batch must never hang
+            if not future.done():
+                future.cancel()
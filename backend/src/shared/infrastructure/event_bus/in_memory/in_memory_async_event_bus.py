@@ -1,31 +1,242 @@
-from typing import List, Type
+from functools import partial
+from typing import Dict, List, Optional, Tuple, Type
+import asyncio
+import inspect
+import logging
 from ....domain.events import DomainEvent
-from ....domain.event_bus import EventBus
+from ....domain.event_bus import EventBus, EventHandler
+from ....domain.domain_event_subscriber import DomainEventSubscriber
+from ...dependency_injection.container import Container
 from ..domain_event_subscribers import DomainEventSubscribers
 from ..domain_event_failover_publisher.domain_event_failover_publisher import DomainEventFailoverPublisher
+from ..domain_event_publish_error import DomainEventPublishError, SubscriberFailure
+from .domain_event_batcher import DomainEventBatcher
+
+logger = logging.getLogger(__name__)
+
+
+def subscriber_name(subscriber: Type[DomainEventSubscriber]) -> str:
+    """Name stored with failed events to retry a single subscriber"""
+    return f"{subscriber.__module__}.{subscriber.__qualname__}"
+
+
+class HandlerSubscriber(DomainEventSubscriber):
+    """Subscriber running a plain function, created by ``subscribe``"""
+    event_type: Type[DomainEvent]
+    handler: EventHandler
+
+    async def on(self, domain_event: DomainEvent) -> None:
+        result = type(self).handler(domain_event)
+        if inspect.isawaitable(result):
+            await result
+
+    @classmethod
+    def subscribed_to(cls) -> List[Type[DomainEvent]]:
+        return [cls.event_type]
+
+
+def handler_subscriber(event_type: Type[DomainEvent], handler: EventHandler) -> Type[HandlerSubscriber]:
+    """Subscriber class for ``handler``, named after it so failed events
+    can be replayed to the same handler in another process"""
+    handler_name = getattr(handler, '__qualname__', type(handler).__qualname__)
+    return type(HandlerSubscriber.__name__, (HandlerSubscriber,), {
+        '__module__': getattr(handler, '__module__', None) or HandlerSubscriber.__module__,
+        '__qualname__': f"{handler_name}[{event_type.__qualname__}]",
+        'event_type': event_type,
+        'handler': staticmethod(handler)
+    })
+
 
 class InMemoryAsyncEventBus(EventBus):
+    """Delivers events to their subscribers in-process.
+
+    By default subscribers run one after another and the first failure
+    sends the whole event to failover and is re-raised. With
+    ``concurrent=True`` the subscribers of each event run at the same time,
+    at most ``max_concurrency`` across the bus, each one cancelled after
+    ``subscriber_timeout`` seconds. A failing subscriber does not affect the
+    others: only its (event, subscriber) pair goes to failover, and once all
+    events are delivered a ``DomainEventPublishError`` lists the failures.
+
+    Subscribers with ``batch_size > 1`` are not called per event: their
+    events, also those of concurrent publishes, are grouped into
+    micro-batches for ``on_batch`` and ``publish`` waits for those batches
+    too. A failed batch sends each of its events to failover for that
+    subscriber.
+
+    ``subscribe`` registers plain functions (sync or async) as subscribers
+    of one event type.
+    """
+
     def __init__(
         self,
         subscribers: DomainEventSubscribers,
-        failover_publisher: DomainEventFailoverPublisher
+        failover_publisher: DomainEventFailoverPublisher,
+        container: Optional[Container] = None,
+        concurrent: bool = False,
+        max_concurrency: int = 10,
+        subscriber_timeout: Optional[float] = None
     ):
+        if max_concurrency <= 0:
+            raise ValueError('max_concurrency must be greater than zero')
         self.subscribers = subscribers
         self.failover_publisher = failover_publisher
+        self._container = container
+        self._concurrent = concurrent
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._subscriber_timeout = subscriber_timeout
+        self._batchers: Dict[Type[DomainEventSubscriber], DomainEventBatcher] = {}
+        self._handlers: Dict[Tuple[Type[DomainEvent], EventHandler], Type[HandlerSubscriber]] = {}
 
     async def publish(self, events: List[DomainEvent]) -> None:
+        batched = self._add_to_batches(events)
+        try:
+            if self._concurrent:
+                failures = await self._publish_concurrently(events)
+            else:
+                failures = []
+                await self._publish_sequentially(events)
+        finally:
+            if batched:
+                await asyncio.gather(*{future for _, _, future in batched}, return_exceptions=True)
+
+        failures.extend(
+            SubscriberFailure(
+                event,
+                subscriber,
+                asyncio.CancelledError() if future.cancelled() else future.exception()
+            )
+            for event, subscriber, future in batched
+            if future.cancelled() or future.exception() is not None
+        )
+        if not failures:
+            return
+        if self._concurrent:
+            raise DomainEventPublishError(failures)
+        raise failures[0].error
+
+    def add_subscribers(self, subscribers: List[Type[DomainEvent]]) -> None:
+        for subscriber in subscribers:
+            self.subscribers.register(subscriber)
+
+    def subscribe(self, event_type: Type[DomainEvent], handler: EventHandler) -> None:
+        if (event_type, handler) in self._handlers:
+            return
+        subscriber = self._handlers[(event_type, handler)] = handler_subscriber(event_type, handler)
+        self.subscribers.register(subscriber)
+
+    def unsubscribe(self, event_type: Type[DomainEvent], handler: EventHandler) -> None:
+        subscriber = self._handlers.pop((event_type, handler), None)
+        if subscriber is not None:
+            self.subscribers.unregister(subscriber)
+
+    async def deliver(self, event: DomainEvent, subscriber: Optional[str] = None) -> None:
+        """Run the subscribers of an event, or only the one named ``subscriber``
+        (see ``subscriber_name``), raising the first failure instead of
+        sending it to failover. Used to replay failed events"""
+        subscribers = self.subscribers.get_by_event(type(event))
+        if subscriber is not None:
+            subscribers = [item for item in subscribers if subscriber_name(item) == subscriber]
+            if not subscribers:
+                raise ValueError(f"No subscriber {subscriber} for event {type(event).__name__}")
+        for item in subscribers:
+            subscriber_instance = self._resolve(item)
+            if item.batch_size > 1:
+                await subscriber_instance.on_batch([event])
+            else:
+                await subscriber_instance.on(event)
+
+    async def _publish_sequentially(self, events: List[DomainEvent]) -> None:
         for event in events:
             subscribers = self.subscribers.get_by_event(type(event))
             
             try:
                 for subscriber in subscribers:
-                    subscriber_instance = subscriber()
+                    if subscriber.batch_size > 1:
+                        continue
+                    subscriber_instance = self._resolve(subscriber)
                     await subscriber_instance.on(event)
             except Exception as e:
                 # Si falla la publicación, guardamos el evento para retry
                 await self.failover_publisher.publish(event)
                 raise e
 
-    def add_subscribers(self, subscribers: List[Type[DomainEvent]]) -> None:
-        for subscriber in subscribers:
-            self.subscribers.register(subscriber)
+    async def _publish_concurrently(self, events: List[DomainEvent]) -> List[SubscriberFailure]:
+        failures: List[SubscriberFailure] = []
+        # Events keep their order: a subscriber never sees an event before the previous one
+        for event in events:
+            subscribers = [
+                subscriber for subscriber in self.subscribers.get_by_event(type(event))
+                if subscriber.batch_size <= 1
+            ]
+            if not subscribers:
+                continue
+            # _deliver returns errors instead of raising; anything it lets escape
+            # is still reported with the other subscribers' results
+            errors = await asyncio.gather(
+                *(self._deliver(event, subscriber) for subscriber in subscribers),
+                return_exceptions=True
+            )
+            for subscriber, error in zip(subscribers, errors):
+                if error is not None:
+                    failures.append(SubscriberFailure(event, subscriber, error))
+        return failures
+
+    def _add_to_batches(
+        self,
+        events: List[DomainEvent]
+    ) -> List[Tuple[DomainEvent, Type[DomainEventSubscriber], asyncio.Future]]:
+        batched = []
+        for event in events:
+            for subscriber in self.subscribers.get_by_event(type(event)):
+                if subscriber.batch_size > 1:
+                    batched.append((event, subscriber, self._batcher(subscriber).add(event)))
+        return batched
+
+    def _batcher(self, subscriber: Type[DomainEventSubscriber]) -> DomainEventBatcher:
+        batcher = self._batchers.get(subscriber)
+        if batcher is None:
+            batcher = self._batchers[subscriber] = DomainEventBatcher(
+                partial(self._deliver_batch, subscriber),
+                subscriber.batch_size,
+                subscriber.batch_window
+            )
+        return batcher
+
+    async def _deliver_batch(self, subscriber: Type[DomainEventSubscriber], events: List[DomainEvent]) -> None:
+        try:
+            async with self._semaphore:
+                await asyncio.wait_for(self._resolve(subscriber).on_batch(events), self._subscriber_timeout)
+        except (Exception, asyncio.CancelledError) as e:
+            # A batch cancelled on shutdown is reported as failed, so it goes to failover too
+            logger.error(f"Subscriber {subscriber.__name__} failed on a batch of {len(events)} events: {e!r}")
+            for event in events:
+                try:
+                    await self.failover_publisher.publish(event, subscriber_name(subscriber))
+                except Exception as failover_error:
+                    logger.error(
+                        f"Could not send {type(event).__name__} for {subscriber.__name__} to failover: {failover_error!r}"
+                    )
+            raise
+
+    async def _deliver(self, event: DomainEvent, subscriber: Type[DomainEventSubscriber]) -> Optional[Exception]:
+        """Run one subscriber, sending the pair to failover if it fails or times out"""
+        try:
+            async with self._semaphore:
+                await asyncio.wait_for(self._resolve(subscriber).on(event), self._subscriber_timeout)
+            return None
+        except Exception as e:
+            logger.error(f"Subscriber {subscriber.__name__} failed on {type(event).__name__}: {e!r}")
+            try:
+                await self.failover_publisher.publish(event, subscriber_name(subscriber))
+            except Exception as failover_error:
+                logger.error(
+                    f"Could not send {type(event).__name__} for {subscriber.__name__} to failover: {failover_error!r}"
+                )
+            return e
+
+    def _resolve(self, subscriber: Type[DomainEventSubscriber]) -> DomainEventSubscriber:
+        """Subscribers not registered in the container are built for each event"""
+        if self._container is None or issubclass(subscriber, HandlerSubscriber):
+            return subscriber()
+        return self._container.resolve_or_register(subscriber)
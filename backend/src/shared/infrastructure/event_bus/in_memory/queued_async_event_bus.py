@@ -0,0 +1,138 @@
+from enum import Enum
+from typing import List, Optional, Type
+import asyncio
+import logging
+from ....domain.events import DomainEvent
+from ....domain.event_bus import EventBus, EventHandler
+from ..domain_event_failover_publisher.domain_event_failover_publisher import DomainEventFailoverPublisher
+
+logger = logging.getLogger(__name__)
+
+
+class Backpressure(Enum):
+    """What ``publish`` does when the queue is full"""
+    BLOCK = "block"
+    DROP_TO_FAILOVER = "drop_to_failover"
+    REJECT = "reject"
+
+
+class EventQueueFullError(Exception):
+    """Raised by ``publish`` with ``Backpressure.REJECT`` when the queue is full"""
+    pass
+
+
+class QueuedAsyncEventBus(EventBus):
+    """Publishes events from background workers instead of the caller.
+
+    ``publish`` only enqueues, so a transaction returns as soon as its
+    events are queued and ``workers`` tasks hand them to the wrapped bus
+    (usually an ``InMemoryAsyncEventBus``, which keeps sending failures to
+    failover). Events published together stay together and in order. At
+    most ``capacity`` publishes wait in the queue; when it is full
+    ``backpressure`` decides whether to wait, store the events in failover
+    or raise ``EventQueueFullError``.
+
+    Usage:
+        event_bus = QueuedAsyncEventBus(InMemoryAsyncEventBus(subscribers, failover), failover)
+        await event_bus.start()
+        ...
+        await event_bus.stop()  # delivers what is still queued
+    """
+
+    def __init__(
+        self,
+        event_bus: EventBus,
+        failover_publisher: DomainEventFailoverPublisher,
+        workers: int = 4,
+        capacity: int = 1000,
+        backpressure: Backpressure = Backpressure.BLOCK
+    ):
+        if workers <= 0:
+            raise ValueError('workers must be greater than zero')
+        if capacity <= 0:
+            raise ValueError('capacity must be greater than zero')
+        self._event_bus = event_bus
+        self.failover_publisher = failover_publisher
+        self._workers = workers
+        self._backpressure = backpressure
+        self._queue: 'asyncio.Queue[List[DomainEvent]]' = asyncio.Queue(capacity)
+        self._tasks: List[asyncio.Task] = []
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        """Publishes waiting for a worker"""
+        return self._queue.qsize()
+
+    async def start(self) -> None:
+        """Start the workers"""
+        if self._closed:
+            raise RuntimeError('Event bus has been stopped')
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._work()) for _ in range(self._workers)]
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting events and wait for the queued ones to be delivered.
+        Whatever is still queued after ``timeout`` seconds goes to failover"""
+        self._closed = True
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Event queue not drained after {timeout}s, sending the rest to failover")
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+
+        while not self._queue.empty():
+            await self._to_failover(self._queue.get_nowait())
+            self._queue.task_done()
+
+    async def publish(self, events: List[DomainEvent]) -> None:
+        if not events:
+            return
+        if self._closed:
+            raise RuntimeError('Event bus has been stopped')
+        if not self._tasks:
+            await self.start()
+
+        batch = list(events)
+        if self._backpressure is Backpressure.BLOCK:
+            await self._queue.put(batch)
+            return
+        try:
+            self._queue.put_nowait(batch)
+        except asyncio.QueueFull:
+            if self._backpressure is Backpressure.REJECT:
+                raise EventQueueFullError(f"Event queue is full ({self._queue.maxsize} pending publishes)")
+            logger.warning(f"Event queue is full, sending {len(batch)} event(s) to failover")
+            await self._to_failover(batch)
+
+    def add_subscribers(self, subscribers: List[Type[DomainEvent]]) -> None:
+        self._event_bus.add_subscribers(subscribers)
+
+    def subscribe(self, event_type: Type[DomainEvent], handler: EventHandler) -> None:
+        self._event_bus.subscribe(event_type, handler)
+
+    def unsubscribe(self, event_type: Type[DomainEvent], handler: EventHandler) -> None:
+        self._event_bus.unsubscribe(event_type, handler)
+
+    async def _work(self) -> None:
+        while True:
+            events = await self._queue.get()
+            try:
+                await self._event_bus.publish(events)
+            except asyncio.CancelledError:
+                # Stopped mid-delivery: keep the events, some subscribers may see them twice
+                await self._to_failover(events)
+                raise
+            except Exception as e:
+                # The wrapped bus has already stored the failed events for retry
+                logger.error(f"Error publishing queued events: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _to_failover(self, events: List[DomainEvent]) -> None:
+        for event in events:
+            await self.failover_publisher.publish(event)
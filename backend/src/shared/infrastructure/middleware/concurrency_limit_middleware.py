@@ -0,0 +1,30 @@
+from typing import Any, Dict, Optional
+import asyncio
+
+from .middleware import Handle, Middleware
+
+
+class ConcurrencyLimitMiddleware(Middleware):
+    """Caps how many messages of each type are handled at the same time.
+    ``limits`` overrides ``default_limit`` per message type. The semaphore of
+    each type is kept when the bus rebuilds its pipelines, so calls started
+    before and after a rebuild share the limit"""
+
+    def __init__(self, default_limit: Optional[int] = None, limits: Optional[Dict[type, int]] = None):
+        self._default_limit = default_limit
+        self._limits = limits or {}
+        self._semaphores: Dict[type, asyncio.Semaphore] = {}
+
+    def wrap(self, message_class: type, handler_class: type, next_handle: Handle) -> Handle:
+        limit = self._limits.get(message_class, self._default_limit)
+        if limit is None:
+            return next_handle
+        semaphore = self._semaphores.get(message_class)
+        if semaphore is None:
+            semaphore = self._semaphores[message_class] = asyncio.Semaphore(limit)
+
+        async def handle(message: Any) -> Any:
+            async with semaphore:
+                return await next_handle(message)
+
+        return handle
@@ -0,0 +1,66 @@
+from bisect import bisect_left
+from typing import Any, Dict, List, Sequence
+import time
+
+from .middleware import Handle, Middleware
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """Latency histogram with fixed bucket upper bounds in seconds"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float, failed: bool = False) -> None:
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if failed:
+            self.errors += 1
+
+    def to_primitives(self) -> Dict[str, Any]:
+        return {
+            'buckets': {str(bound): count for bound, count in zip(self.buckets + ('+Inf',), self.counts)},
+            'count': self.count,
+            'errors': self.errors,
+            'sum': self.total
+        }
+
+
+class LatencyHistogramMiddleware(Middleware):
+    """Records handling latency per message type. Histograms are kept when
+    the bus rebuilds its pipelines"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self._buckets = buckets
+        self.histograms: Dict[type, LatencyHistogram] = {}
+
+    def wrap(self, message_class: type, handler_class: type, next_handle: Handle) -> Handle:
+        histogram = self.histograms.get(message_class)
+        if histogram is None:
+            histogram = self.histograms[message_class] = LatencyHistogram(self._buckets)
+
+        async def handle(message: Any) -> Any:
+            started = time.perf_counter()
+            failed = True
+            try:
+                result = await next_handle(message)
+                failed = False
+                return result
+            finally:
+                histogram.observe(time.perf_counter() - started, failed)
+
+        return handle
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Histograms by module-qualified message class name"""
+        return {
+            f"{message_class.__module__}.{message_class.__qualname__}": histogram.to_primitives()
+            for message_class, histogram in self.histograms.items()
+        }
@@ -0,0 +1,30 @@
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Sequence
+
+Handle = Callable[[Any], Awaitable[Any]]
+
+
+class Middleware(ABC):
+    """Step of a command or query bus pipeline.
+
+    ``wrap`` is called once per message type when the pipeline is built,
+    so per-type setup (histograms, semaphores, timeouts) happens at
+    registration time and the returned callable is all that runs per call.
+    Return ``next_handle`` unchanged to skip a message type at no cost.
+    """
+
+    @abstractmethod
+    def wrap(self, message_class: type, handler_class: type, next_handle: Handle) -> Handle:
+        pass
+
+
+def build_pipeline(
+    middlewares: Sequence[Middleware],
+    message_class: type,
+    handler_class: type,
+    handle: Handle
+) -> Handle:
+    """Compose middlewares around ``handle``; the first middleware is the outermost"""
+    for middleware in reversed(middlewares):
+        handle = middleware.wrap(message_class, handler_class, handle)
+    return handle
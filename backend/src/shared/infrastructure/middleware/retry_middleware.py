@@ -0,0 +1,58 @@
+from typing import Any, Optional, Sequence, Tuple, Type
+import asyncio
+import logging
+import random
+
+from .middleware import Handle, Middleware
+
+logger = logging.getLogger(__name__)
+
+
+class RetryMiddleware(Middleware):
+    """Retries transient failures with exponential backoff and full jitter.
+
+    Only exceptions in ``retry_on`` are retried, and only for the message
+    types in ``message_types`` when given. Handlers behind it must be
+    idempotent, since a failed attempt may have had side effects.
+    """
+
+    def __init__(
+        self,
+        retry_on: Tuple[Type[BaseException], ...],
+        max_attempts: int = 3,
+        base_delay: float = 0.05,
+        max_delay: float = 1.0,
+        message_types: Optional[Sequence[type]] = None
+    ):
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be at least 1')
+        self._retry_on = retry_on
+        self._max_attempts = max_attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._message_types = set(message_types) if message_types is not None else None
+
+    def wrap(self, message_class: type, handler_class: type, next_handle: Handle) -> Handle:
+        if self._max_attempts == 1:
+            return next_handle
+        if self._message_types is not None and message_class not in self._message_types:
+            return next_handle
+
+        async def handle(message: Any) -> Any:
+            attempt = 1
+            while True:
+                try:
+                    return await next_handle(message)
+                except self._retry_on as e:
+                    if attempt >= self._max_attempts:
+                        raise
+                    logger.warning(
+                        f"Retrying {message_class.__name__} after attempt {attempt} failed: {str(e)}"
+                    )
+                    await asyncio.sleep(self._backoff(attempt))
+                    attempt += 1
+
+        return handle
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self._max_delay, self._base_delay * 2 ** (attempt - 1)))
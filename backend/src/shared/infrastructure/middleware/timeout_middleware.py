@@ -0,0 +1,23 @@
+from typing import Any, Dict, Optional
+import asyncio
+
+from .middleware import Handle, Middleware
+
+
+class TimeoutMiddleware(Middleware):
+    """Cancels handling that exceeds its deadline and raises ``asyncio.TimeoutError``.
+    ``timeouts`` overrides ``default_timeout`` (seconds) per message type"""
+
+    def __init__(self, default_timeout: Optional[float] = None, timeouts: Optional[Dict[type, float]] = None):
+        self._default_timeout = default_timeout
+        self._timeouts = timeouts or {}
+
+    def wrap(self, message_class: type, handler_class: type, next_handle: Handle) -> Handle:
+        timeout = self._timeouts.get(message_class, self._default_timeout)
+        if timeout is None:
+            return next_handle
+
+        async def handle(message: Any) -> Any:
+            return await asyncio.wait_for(next_handle(message), timeout)
+
+        return handle
@@ -0,0 +1,171 @@
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Union
+import copy
+import logging
+
+from sqlalchemy import inspect
+
+from .redis.cache_service import CacheService
+from .redis.local_cache import CacheStats, LocalCache
+
+logger = logging.getLogger(__name__)
+
+# Default ttl over a LocalCache, which other workers cannot invalidate
+LOCAL_TTL = timedelta(seconds=5)
+
+
+class EntityCache:
+    """Read-through cache of entity rows shared between requests.
+
+    Repositories given an ``EntityCache`` look aggregates up by id here
+    before querying, and store the rows they read. The cached value is the
+    model's column values, not the entity, so each hit builds a new model
+    and entity and cached state is never shared between requests. Writes
+    made through the repository drop the entries of the ids they touch.
+
+    A miss takes a lease on the key before querying, and invalidating the
+    key revokes it, so a row read before a concurrent write committed is
+    not stored after that write invalidated the key. Only the caller
+    holding the lease stores the row.
+
+    ``cache`` is a ``CacheService`` (Redis, with its optional local tier
+    invalidated across workers) or a ``LocalCache``. A ``LocalCache`` only
+    sees this process's writes, so other workers keep stale rows until
+    ``ttl``, which defaults to ``LOCAL_TTL`` for it; pass
+    ``single_process=True`` when no other process writes the tables. Cache
+    errors are logged and the lookup falls back to the database.
+    """
+
+    def __init__(
+        self,
+        cache: Union[LocalCache, CacheService],
+        ttl: Optional[timedelta] = None,
+        prefix: str = 'entity',
+        lease_timeout: timedelta = timedelta(seconds=5),
+        single_process: bool = False
+    ):
+        self._cache = cache
+        self._local = isinstance(cache, LocalCache)
+        shared_with_workers = self._local and not single_process
+        if ttl is None:
+            ttl = LOCAL_TTL if shared_with_workers else timedelta(minutes=5)
+        elif shared_with_workers and ttl > LOCAL_TTL:
+            logger.warning(
+                f"EntityCache over a LocalCache serves rows changed by other workers for up to {ttl}; "
+                f"use a CacheService when several processes write the same tables"
+            )
+        self._ttl = ttl
+        self._prefix = prefix
+        self._lease_timeout = lease_timeout
+        # Leases of the keys being loaded, for a LocalCache
+        self._leases: Dict[str, object] = {}
+        self.stats = CacheStats()
+
+    def key(self, model_class: type, entity_id: Any) -> str:
+        return f"{self._prefix}:{inspect(model_class).local_table.name}:{entity_id}"
+
+    async def get_model(self, model_class: type, entity_id: Any) -> Optional[Any]:
+        """Detached model built from the cached row, None on a miss"""
+        key = self.key(model_class, entity_id)
+        try:
+            row = self._cache.get(key) if self._local else await self._cache.get(key)
+        except Exception as e:
+            logger.warning(f"Error reading {key} from the entity cache: {str(e)}")
+            row = None
+        if row is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+
+        model = inspect(model_class).class_manager.new_instance()
+        for name, value in _copy_row(row).items():
+            setattr(model, name, value)
+        return model
+
+    async def get_or_load(
+        self,
+        model_class: type,
+        entity_id: Any,
+        load: Callable[[], Awaitable[Optional[Any]]]
+    ) -> Optional[Any]:
+        """Model from the cache, or from ``load`` on a miss. The loaded model
+        is stored unless the key was invalidated while it was being loaded"""
+        model = await self.get_model(model_class, entity_id)
+        if model is not None:
+            return model
+
+        key = self.key(model_class, entity_id)
+        lease = await self._acquire_lease(key)
+        stored = False
+        try:
+            model = await load()
+            if model is not None and lease is not None:
+                stored = await self._store(key, model, lease)
+        finally:
+            if lease is not None and not stored:
+                await self._release_lease(key, lease)
+        return model
+
+    async def invalidate(self, model_class: type, entity_ids: Iterable[Any]) -> None:
+        keys = [self.key(model_class, entity_id) for entity_id in entity_ids]
+        if not keys:
+            return
+        try:
+            if self._local:
+                for key in keys:
+                    self._leases.pop(key, None)
+                    self._cache.invalidate(key)
+            else:
+                await self._cache.delete_many(keys)
+        except Exception as e:
+            # Entries that could not be dropped expire after ``ttl``
+            logger.error(f"Error invalidating {len(keys)} entity cache entries: {str(e)}")
+
+    async def _acquire_lease(self, key: str) -> Optional[Any]:
+        """Lease to store ``key``, None if another caller is loading it"""
+        if self._local:
+            if key in self._leases:
+                return None
+            lease = self._leases[key] = object()
+            return lease
+        try:
+            return await self._cache.acquire_lease(key, self._lease_timeout)
+        except Exception as e:
+            logger.warning(f"Error taking the lease of {key} in the entity cache: {str(e)}")
+            return None
+
+    async def _release_lease(self, key: str, lease: Any) -> None:
+        if self._local:
+            if self._leases.get(key) is lease:
+                del self._leases[key]
+            return
+        try:
+            await self._cache.release_lease(key, lease)
+        except Exception as e:
+            # The lease expires after ``lease_timeout``
+            logger.warning(f"Error releasing the lease of {key} in the entity cache: {str(e)}")
+
+    async def _store(self, key: str, model: Any, lease: Any) -> bool:
+        """Cache the column values of a model loaded from the database if
+        ``lease`` is still held, releasing it. Returns whether it was stored"""
+        row: Dict[str, Any] = {attribute.key: getattr(model, attribute.key) for attribute in inspect(type(model)).column_attrs}
+        try:
+            if not self._local:
+                return await self._cache.set_with_lease(key, row, lease, self._ttl)
+            if self._leases.get(key) is not lease:
+                return False
+            del self._leases[key]
+            self._cache.set(key, _copy_row(row), self._ttl.total_seconds())
+            return True
+        except Exception as e:
+            logger.warning(f"Error writing {key} to the entity cache: {str(e)}")
+            return False
+
+
+def _copy_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Row with its containers (JSON and array columns) copied, so entities
+    never modify a row held by an in-process cache"""
+    return {
+        name: copy.deepcopy(value) if isinstance(value, (list, dict, set)) else value
+        for name, value in row.items()
+    }
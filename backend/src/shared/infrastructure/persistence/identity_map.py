@@ -0,0 +1,80 @@
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .redis.local_cache import CacheStats
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[type, str]
+
+
+class IdentityMap:
+    """Entities loaded in the current transaction, by class and id.
+
+    ``SqlAlchemyUnitOfWork`` creates one and stores it in ``session.info``,
+    so every repository built on that session returns the same instance
+    when an aggregate is looked up by id more than once, without another
+    query. It is cleared when the transaction commits or rolls back.
+    Ids written in the transaction are remembered so repositories skip
+    the shared entity cache for them, and ``after_commit`` callbacks run
+    once the unit of work has committed.
+    """
+    SESSION_KEY = 'identity_map'
+
+    def __init__(self):
+        self._entities: Dict[Key, Any] = {}
+        self._written: Set[Key] = set()
+        self._after_commit: List[Callable[[], Awaitable[None]]] = []
+        self.stats = CacheStats()
+
+    @classmethod
+    def of(cls, session: AsyncSession) -> Optional['IdentityMap']:
+        """Identity map of the unit of work that owns ``session``, if any"""
+        return session.info.get(cls.SESSION_KEY)
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def get(self, entity_class: type, entity_id: Any) -> Optional[Any]:
+        entity = self._entities.get((entity_class, str(entity_id)))
+        if entity is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return entity
+
+    def add(self, entity_class: type, entity_id: Any, entity: Any) -> None:
+        self._entities[(entity_class, str(entity_id))] = entity
+
+    def remove(self, entity_class: type, entity_id: Any) -> None:
+        self._entities.pop((entity_class, str(entity_id)), None)
+
+    def mark_written(self, entity_class: type, entity_ids: Iterable[Any]) -> None:
+        """Record ids inserted, updated or deleted in this transaction"""
+        self._written.update((entity_class, str(entity_id)) for entity_id in entity_ids)
+
+    def was_written(self, entity_class: type, entity_id: Any) -> bool:
+        return (entity_class, str(entity_id)) in self._written
+
+    def after_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Run ``callback`` after the unit of work commits; dropped on rollback"""
+        self._after_commit.append(callback)
+
+    async def committed(self) -> None:
+        """Run the ``after_commit`` callbacks and clear the map"""
+        callbacks = self._after_commit
+        self.clear()
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                # The transaction is already committed, so the error is not raised
+                logger.error(f"Error running after commit callback: {str(e)}")
+
+    def clear(self) -> None:
+        """Forget the transaction's entities; ``stats`` are kept"""
+        self._entities.clear()
+        self._written = set()
+        self._after_commit = []
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, BigInteger, Index, Integer, Text
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -11,3 +11,28 @@ class BaseModel(Base):
     id = Column(String, primary_key=True)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Incremented by every repository update, for optimistic concurrency.
+    # The server default fills existing rows when the column is added
+    version = Column(Integer, nullable=False, default=1, server_default='1')
+
+
+class OutboxMessageModel(Base):
+    """Domain event committed with the transaction that raised it, waiting to be relayed"""
+    __tablename__ = 'outbox_messages'
+    __table_args__ = (
+        Index('ix_outbox_messages_pending', 'published_at', 'position'),
+    )
+
+    position = Column(BigInteger().with_variant(Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    event_id = Column(String, nullable=False, unique=True)
+    event_type = Column(String, nullable=False)
+    aggregate_id = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    occurred_on = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    published_at = Column(DateTime, nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    # Set when the message ran out of attempts; it is no longer relayed
+    dead_lettered_at = Column(DateTime, nullable=True)
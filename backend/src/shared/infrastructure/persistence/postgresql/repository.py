@@ -1,43 +1,119 @@
-from typing import Generic, TypeVar, Optional, List, Type
+from typing import Any, AsyncIterator, ClassVar, Dict, Generic, Iterable, TypeVar, Optional, List, Sequence, Tuple, Type
+from functools import partial
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import inspect, select, update
+from sqlalchemy.sql import Select
+from ....domain.criteria.criteria import Criteria
 from ....domain.repositories import Repository
 from ....domain.entities import Entity
+from ....domain.errors import ConcurrencyError
 from ....domain.value_objects import EntityId
+from ..entity_cache import EntityCache
+from ..identity_map import IdentityMap
+from ..sqlalchemy.bulk_insert import bulk_insert, bulk_insert_returning
+from ..sqlalchemy.criteria_converter import CriteriaConverter, Page
 
 T = TypeVar('T', bound=Entity)
 M = TypeVar('M')
 
 class SQLAlchemyRepository(Repository[T], Generic[T, M]):
-    """Base SQLAlchemy repository implementation"""
+    """Base SQLAlchemy repository implementation.
 
-    def __init__(self, session: AsyncSession, model_class: Type[M], entity_class: Type[T]):
+    Entities are marked clean when they are loaded or saved, so ``update``
+    only writes what changed afterwards. Models with a ``version`` column
+    get optimistic concurrency. Inside a ``SqlAlchemyUnitOfWork`` lookups by
+    id go through the unit of work's identity map, and with an
+    ``entity_cache`` through a read-through cache shared between requests.
+    There ``save``, ``update`` and ``delete`` only flush and the unit of
+    work commits; without one each of them commits.
+    """
+    # Model attributes that criteria can filter and order by
+    criteria_fields: ClassVar[Tuple[str, ...]] = ()
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        model_class: Type[M],
+        entity_class: Type[T],
+        chunk_size: int = 500,
+        entity_cache: Optional[EntityCache] = None
+    ):
         self._session = session
         self._model_class = model_class
         self._entity_class = entity_class
+        self._chunk_size = chunk_size
+        self._entity_cache = entity_cache
+        mapper = inspect(model_class)
+        self._column_attributes = list(mapper.column_attrs)
+        self._column_keys = frozenset(attribute.key for attribute in self._column_attributes)
+        self._versioned = 'version' in mapper.column_attrs
+        self._criteria = CriteriaConverter(model_class, self.criteria_fields)
 
     async def save(self, entity: T) -> None:
         model = self._to_model(entity)
         self._session.add(model)
-        await self._session.commit()
+        await self._commit()
+        entity.mark_clean()
+        await self._written([entity.id])
+        self._remember(entity.id, entity)
+
+    async def save_many(self, entities: Iterable[T]) -> None:
+        """Insert entities with multi-row INSERTs of ``chunk_size`` rows, without committing"""
+        await self._bulk_write(entities)
+
+    async def upsert_many(
+        self,
+        entities: Iterable[T],
+        update_columns: Optional[Iterable[str]] = None
+    ) -> None:
+        """Insert entities, updating the rows whose id already exists, without committing.
+        Existing rows keep ``created_at`` unless ``update_columns`` lists it"""
+        await self._bulk_write(entities, upsert=True, update_columns=update_columns)
 
     async def get_by_id(self, entity_id: EntityId) -> Optional[T]:
-        result = await self._session.execute(
-            select(self._model_class).where(self._model_class.id == str(entity_id))
-        )
-        model = result.scalar_one_or_none()
-        return self._to_entity(model) if model else None
+        """Entity with ``entity_id``, the same instance for every lookup in a unit of work"""
+        identity_map = IdentityMap.of(self._session)
+        if identity_map is not None:
+            entity = identity_map.get(self._entity_class, entity_id)
+            if entity is not None:
+                return entity
+        model = await self._find_model(str(entity_id), identity_map)
+        if model is None:
+            return None
+        entity = self._loaded(model)
+        self._remember(entity_id, entity)
+        return entity
 
     async def update(self, entity: T) -> None:
-        result = await self._session.execute(
-            select(self._model_class).where(self._model_class.id == str(entity.id))
-        )
-        model = result.scalar_one_or_none()
-        if model:
-            for key, value in self._to_model(entity).__dict__.items():
-                if not key.startswith('_'):
-                    setattr(model, key, value)
-        await self._session.commit()
+        """Write the attributes changed since the entity was loaded with one
+        ``UPDATE ... RETURNING``, without reading the row first. Versioned rows
+        must still be at ``entity.version``, otherwise nothing is written and
+        ConcurrencyError is raised"""
+        values = self._changed_values(entity)
+        if values:
+            statement = update(self._model_class).where(self._model_class.id == str(entity.id))
+            if self._versioned:
+                version = self._model_class.version
+                statement = (
+                    statement.where(version == entity.version)
+                    .values({**values, version: version + 1})
+                    .returning(version)
+                )
+            else:
+                statement = statement.values(values).returning(self._model_class.id)
+            row = (await self._session.execute(statement)).first()
+            if self._versioned:
+                if row is None:
+                    raise ConcurrencyError(
+                        f"{self._entity_class.__name__} {entity.id} was modified or deleted "
+                        f"since version {entity.version}"
+                    )
+                entity.version = row[0]
+            entity.mark_clean()
+        await self._commit()
+        if values:
+            await self._written([entity.id])
+        self._remember(entity.id, entity)
 
     async def delete(self, entity_id: EntityId) -> None:
         result = await self._session.execute(
@@ -46,11 +122,165 @@ class SQLAlchemyRepository(Repository[T], Generic[T, M]):
         model = result.scalar_one_or_none()
         if model:
             await self._session.delete(model)
-            await self._session.commit()
+            await self._commit()
+            await self._written([entity_id])
+        identity_map = IdentityMap.of(self._session)
+        if identity_map is not None:
+            identity_map.remove(self._entity_class, entity_id)
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit and miss counters of the identity map and the entity cache"""
+        stats = {}
+        identity_map = IdentityMap.of(self._session)
+        if identity_map is not None:
+            stats['identity_map'] = identity_map.stats.to_primitives()
+        if self._entity_cache is not None:
+            stats['entity_cache'] = self._entity_cache.stats.to_primitives()
+        return stats
 
     async def list_all(self) -> List[T]:
         result = await self._session.execute(select(self._model_class))
-        return [self._to_entity(model) for model in result.scalars().all()]
+        return [self._loaded(model) for model in result.scalars().all()]
+
+    async def search_by_criteria(self, criteria: Criteria) -> List[T]:
+        """Entities matching ``criteria``, with its order, offset and limit"""
+        result = await self._session.execute(self._criteria.select(criteria))
+        return [self._loaded(model) for model in result.scalars().all()]
+
+    async def search_page(self, criteria: Criteria, after: Optional[Sequence[Any]] = None) -> Page[T]:
+        """Page of ``criteria.limit`` entities after the key returned with the
+        previous page (keyset pagination)"""
+        result = await self._session.execute(self._criteria.select(criteria, after))
+        models = result.scalars().all()
+        return Page([self._loaded(model) for model in models], self._criteria.next_after(criteria, models))
+
+    async def stream_all(self, yield_per: int = 1000) -> AsyncIterator[T]:
+        """Iterate over every entity with a server-side cursor, fetching and
+        mapping ``yield_per`` rows at a time so memory does not grow with the table"""
+        async for entity in self._stream(select(self._model_class), yield_per):
+            yield entity
+
+    async def stream_by_criteria(self, criteria: Criteria, yield_per: int = 1000) -> AsyncIterator[T]:
+        """Like ``stream_all`` for the entities matching ``criteria``"""
+        async for entity in self._stream(self._criteria.select(criteria), yield_per):
+            yield entity
+
+    async def _stream(self, statement: Select, yield_per: int) -> AsyncIterator[T]:
+        result = await self._session.stream(statement.execution_options(yield_per=yield_per))
+        try:
+            # Models are only held weakly by the session, so each chunk is freed once mapped
+            async for models in result.scalars().partitions():
+                for model in models:
+                    yield self._loaded(model)
+        finally:
+            await result.close()
+
+    async def _bulk_write(
+        self,
+        entities: Iterable[T],
+        upsert: bool = False,
+        update_columns: Optional[Iterable[str]] = None
+    ) -> None:
+        """Write entities in bulk, then give them the version each row was
+        left at (an upsert increments it) and mark them clean"""
+        entities = list(entities)
+        models = [self._to_model(entity) for entity in entities]
+        if self._versioned:
+            rows = await bulk_insert_returning(
+                self._session,
+                self._model_class,
+                models,
+                ('id', 'version'),
+                self._chunk_size,
+                upsert=upsert,
+                update_columns=update_columns
+            )
+            versions = dict(rows)
+            for entity, model in zip(entities, models):
+                entity.version = versions[model.id]
+        else:
+            await bulk_insert(
+                self._session,
+                self._model_class,
+                models,
+                self._chunk_size,
+                upsert=upsert,
+                update_columns=update_columns
+            )
+        for entity in entities:
+            entity.mark_clean()
+        await self._written_many(entities)
+
+    async def _find_model(self, entity_id: str, identity_map: Optional[IdentityMap]) -> Optional[M]:
+        """Model from the entity cache or the database. Ids written in the
+        current transaction skip the cache, which must only hold committed rows"""
+        entity_cache = self._entity_cache
+        if entity_cache is None or (identity_map is not None and identity_map.was_written(self._entity_class, entity_id)):
+            return await self._select_by_id(entity_id)
+        return await entity_cache.get_or_load(self._model_class, entity_id, partial(self._select_by_id, entity_id))
+
+    async def _commit(self) -> None:
+        """Commit, unless the session belongs to a ``SqlAlchemyUnitOfWork``:
+        then only flush, and the unit of work commits the writes together
+        with its outbox messages"""
+        if IdentityMap.of(self._session) is None:
+            await self._session.commit()
+        else:
+            await self._session.flush()
+
+    async def _select_by_id(self, entity_id: str) -> Optional[M]:
+        result = await self._session.execute(
+            select(self._model_class).where(self._model_class.id == entity_id)
+        )
+        return result.scalar_one_or_none()
+
+    def _remember(self, entity_id: Any, entity: T) -> None:
+        identity_map = IdentityMap.of(self._session)
+        if identity_map is not None:
+            identity_map.add(self._entity_class, entity_id, entity)
+
+    async def _written_many(self, entities: List[T]) -> None:
+        await self._written([entity.id for entity in entities])
+        for entity in entities:
+            self._remember(entity.id, entity)
+
+    async def _written(self, entity_ids: List[Any]) -> None:
+        """Drop written ids from the entity cache now and again after the unit
+        of work commits, since other requests may cache the old row meanwhile"""
+        identity_map = IdentityMap.of(self._session)
+        if identity_map is not None:
+            identity_map.mark_written(self._entity_class, entity_ids)
+        if self._entity_cache is not None:
+            await self._entity_cache.invalidate(self._model_class, entity_ids)
+            if identity_map is not None:
+                identity_map.after_commit(partial(self._entity_cache.invalidate, self._model_class, entity_ids))
+
+    def _loaded(self, model: M) -> T:
+        entity = self._to_entity(model)
+        if self._versioned:
+            entity.version = model.version
+        entity.mark_clean()
+        return entity
+
+    def _changed_values(self, entity: T) -> Dict[Any, Any]:
+        """Model values of the entity's dirty attributes, as ``_to_model`` maps
+        them. A dirty attribute with no column of the same name may be mapped
+        to any column, so then every column ``_to_model`` sets is written.
+        Override when attribute and column names differ"""
+        dirty = entity.dirty_fields
+        if not dirty:
+            return {}
+        model = self._to_model(entity)
+        columns = [
+            attribute for attribute in self._column_attributes
+            if attribute.key != 'version' and not attribute.columns[0].primary_key
+        ]
+        # Columns _to_model leaves unset (e.g. created_at) are never overwritten
+        written = model.__dict__ if not dirty <= self._column_keys else dirty
+        return {
+            getattr(self._model_class, attribute.key): getattr(model, attribute.key)
+            for attribute in columns if attribute.key in written
+        }
 
     def _to_model(self, entity: T) -> M:
         """Convert domain entity to SQLAlchemy model"""
@@ -0,0 +1,64 @@
+from datetime import timedelta
+from functools import partial, wraps
+from typing import Any, Awaitable, Callable, Optional, Sequence, TypeVar, Union
+import inspect
+
+from .cache_key import build_cache_key, qualified_name
+from .cache_service import CacheService
+
+T = TypeVar('T')
+
+
+def cached(
+    cache: Union[CacheService, str],
+    ttl: Optional[timedelta] = None,
+    key: Optional[Callable[..., Any]] = None,
+    tags: Optional[Callable[..., Sequence[str]]] = None
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Cache the results of an async function or method.
+
+    Keys are namespaced by the function's qualified name and derived from a
+    canonical encoding of the bound arguments (see ``canonicalize``), so
+    ``f(query)`` and ``f(query=query)`` share an entry and equal dataclass
+    queries always hit it. ``key`` receives the call arguments (without
+    ``self``) and returns what to hash instead; ``tags`` returns the tags
+    to store the entry with. For methods, ``cache`` may name the instance
+    attribute holding the ``CacheService``.
+
+    Usage:
+        class GetProcessStatusQueryHandler(QueryHandler[GetProcessStatusQuery, ProcessStatusResponse]):
+            @cached('_cache', ttl=timedelta(minutes=5), key=lambda query: query.process_id)
+            async def handle(self, query: GetProcessStatusQuery) -> ProcessStatusResponse:
+                ...
+    """
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        signature = inspect.signature(func)
+        parameters = list(signature.parameters)
+        bound_to_instance = bool(parameters) and parameters[0] in ('self', 'cls')
+        namespace = qualified_name(func)
+
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            cache_service = getattr(args[0], cache) if isinstance(cache, str) else cache
+            call_args = args[1:] if bound_to_instance else args
+
+            if key is not None:
+                cache_key = build_cache_key(namespace, key(*call_args, **kwargs))
+            else:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                arguments = dict(bound.arguments)
+                if bound_to_instance:
+                    arguments.pop(parameters[0])
+                cache_key = build_cache_key(namespace, arguments)
+
+            return await cache_service.get_or_set(
+                cache_key,
+                partial(func, *args, **kwargs),
+                ttl,
+                tags(*call_args, **kwargs) if tags else None
+            )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,80 @@
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from functools import partial
+from typing import Any, Callable
+from uuid import UUID
+import hashlib
+import json
+from ....domain.value_object.value_object import instance_state
+
+
+def qualified_name(obj: Any) -> str:
+    """Module-qualified name of a function or class. Other callables, such
+    as instances defining ``__call__``, are named after their class"""
+    if not hasattr(obj, '__qualname__'):
+        obj = type(obj)
+    return f"{obj.__module__}.{obj.__qualname__}"
+
+
+def canonicalize(value: Any) -> Any:
+    """Convert a value into a JSON-compatible form that only depends on its contents.
+
+    Dataclasses (queries, criteria, value objects) are encoded by type and
+    field values, mappings and sets are sorted, so equal arguments always
+    produce the same key no matter how they were built. Values without a
+    stable representation raise TypeError instead of falling back to repr().
+    """
+    # Before the plain types, so str and int enum members do not collide with their values
+    if isinstance(value, Enum):
+        return [qualified_name(type(value)), canonicalize(value.value)]
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, float):
+        return ['float', repr(value)]
+    if is_dataclass(value) and not isinstance(value, type):
+        state = {field.name: canonicalize(getattr(value, field.name)) for field in fields(value) if field.compare}
+        # Value objects such as DateTime keep their state outside dataclass fields
+        for name, item in instance_state(value).items():
+            if name not in state:
+                state[name] = canonicalize(item)
+        return [qualified_name(type(value)), state]
+    if isinstance(value, (datetime, date, time)):
+        return [type(value).__name__, value.isoformat()]
+    if isinstance(value, (Decimal, UUID)):
+        return [type(value).__name__, str(value)]
+    if isinstance(value, bytes):
+        return ['bytes', value.hex()]
+    if isinstance(value, dict):
+        items = [[canonicalize(key), canonicalize(item)] for key, item in value.items()]
+        return ['dict', sorted(items, key=_sort_key)]
+    if isinstance(value, (list, tuple)):
+        return [type(value).__name__, [canonicalize(item) for item in value]]
+    if isinstance(value, (set, frozenset)):
+        return ['set', sorted((canonicalize(item) for item in value), key=_sort_key)]
+    if hasattr(value, 'to_primitives'):
+        return [qualified_name(type(value)), canonicalize(value.to_primitives())]
+    raise TypeError(
+        f"Cannot derive a stable cache key from {type(value).__name__}; provide a key function"
+    )
+
+
+def _sort_key(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(',', ':'))
+
+
+def build_cache_key(namespace: str, value: Any) -> str:
+    """Build ``<namespace>:<sha256 of the canonical value>``"""
+    digest = hashlib.sha256(_sort_key(canonicalize(value)).encode()).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+def function_cache_key(func: Callable[..., Any], *args: Any, **kwargs: Any) -> str:
+    """Cache key for a call, namespaced by the function's qualified name.
+    Partials are unwrapped into their function and bound arguments"""
+    while isinstance(func, partial):
+        args = func.args + args
+        kwargs = {**func.keywords, **kwargs}
+        func = func.func
+    return build_cache_key(qualified_name(func), [list(args), kwargs])
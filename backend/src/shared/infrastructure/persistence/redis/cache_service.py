@@ -1,59 +1,312 @@
-from typing import Optional, Any, TypeVar, Generic, Callable, Awaitable
+from typing import Optional, Any, Dict, List, Sequence, TypeVar, Generic, Callable, Awaitable
 from datetime import timedelta
-import json
-import hashlib
+from functools import partial
+from uuid import uuid4
+import asyncio
+import logging
+import math
+import random
+import re
+import time
 
 from .redis_client import RedisClient
+from .cache_key import function_cache_key
+from .local_cache import LocalCache, CacheStats
+from .local_cache_invalidator import LocalCacheInvalidator
 
 T = TypeVar('T')
+logger = logging.getLogger(__name__)
+
+_GLOB_SPECIAL_CHARS = re.compile(r'([*?\[\]\\])')
+
+# Key marking the entries written by ``get_or_set``, which wrap the value
+# with its refresh metadata
+ENVELOPE_MARKER = '__cache_envelope__'
 
 
 class CacheService(Generic[T]):
-    """Service for handling caching operations"""
+    """Service for handling caching operations.
+
+    With a ``local_cache`` reads are served from an in-process LRU tier first
+    and only go to Redis on a local miss. Local entries never outlive the
+    Redis TTL and are dropped when other workers change the key (see
+    ``LocalCacheInvalidator``). Values returned from the local tier are
+    shared between callers and must be treated as read-only.
+
+    ``get_or_set``/``cached`` protect expensive computations from stampedes:
+    only one computation per key runs in this process, ``distributed_lock``
+    extends that to all workers, entries are kept ``stale_ttl`` past their
+    expiration to be served while a single caller revalidates, and
+    ``early_refresh_beta`` (0 disables it) triggers probabilistic refreshes
+    shortly before expiry so hot keys never fall out of the cache.
+    """
     
-    def __init__(self, redis_client: RedisClient, prefix: str = "cache"):
+    def __init__(
+        self,
+        redis_client: RedisClient,
+        prefix: str = "cache",
+        local_cache: Optional[LocalCache] = None,
+        distributed_lock: bool = False,
+        lock_timeout: timedelta = timedelta(seconds=30),
+        lock_poll_interval: float = 0.05,
+        stale_ttl: Optional[timedelta] = None,
+        early_refresh_beta: float = 1.0
+    ):
         self._redis = redis_client
         self._prefix = prefix
+        self._local_cache = local_cache
+        self._distributed_lock = distributed_lock
+        self._lock_timeout = lock_timeout.total_seconds()
+        self._lock_poll_interval = lock_poll_interval
+        self._stale_ttl = stale_ttl
+        self._early_refresh_beta = early_refresh_beta
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Background refreshes are kept apart so callers never wait on one
+        self._refreshing: Dict[str, asyncio.Future] = {}
+        self._redis_stats = CacheStats()
+        self._invalidator = (
+            LocalCacheInvalidator(redis_client, local_cache, prefix)
+            if local_cache is not None else None
+        )
+    
+    async def start(self) -> None:
+        """Start listening for cross-worker invalidations of the local tier"""
+        if self._invalidator:
+            await self._invalidator.start()
+    
+    async def stop(self) -> None:
+        """Stop listening for invalidations"""
+        if self._invalidator:
+            await self._invalidator.stop()
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit and miss counters for each tier"""
+        stats = {'redis': self._redis_stats.to_primitives()}
+        if self._local_cache is not None:
+            stats['local'] = self._local_cache.stats.to_primitives()
+        return stats
+    
+    def _record_redis_lookup(self, value: Any) -> None:
+        if value is None:
+            self._redis_stats.misses += 1
+        else:
+            self._redis_stats.hits += 1
     
     def _build_key(self, key: str) -> str:
         """Build a prefixed cache key"""
         return f"{self._prefix}:{key}"
     
-    def _generate_key(self, *args, **kwargs) -> str:
-        """Generate a cache key from arguments"""
-        # Convert args and kwargs to a string representation
-        key_parts = [str(arg) for arg in args]
-        key_parts.extend(f"{k}:{v}" for k, v in sorted(kwargs.items()))
-        key_str = ":".join(key_parts)
-        
-        # Create a hash of the key string
-        return hashlib.sha256(key_str.encode()).hexdigest()
+    def _build_tag_key(self, tag: str) -> str:
+        """Build the key of the sorted set indexing the entries of a tag"""
+        return f"{self._prefix}:tag:{tag}"
+    
+    def _build_lease_key(self, key: str) -> str:
+        """Build the key holding the fill lease of an entry"""
+        return f"{self._prefix}:lease:{key}"
     
     async def get(self, key: str) -> Optional[T]:
-        """Get a value from cache"""
-        return await self._redis.get(self._build_key(key))
+        """Get a value from cache, unwrapping entries written by ``get_or_set``"""
+        return self._unwrap(await self._get_entry(key))
+    
+    async def _get_entry(self, key: str) -> Any:
+        """Stored entry, including the ``get_or_set`` envelope"""
+        full_key = self._build_key(key)
+        if self._local_cache is None:
+            value = await self._redis.get(full_key)
+            self._record_redis_lookup(value)
+            return value
+        
+        value = self._local_cache.get(full_key)
+        if value is not None:
+            return value
+        
+        value, ttl = await self._redis.get_with_ttl(full_key)
+        self._record_redis_lookup(value)
+        if value is not None:
+            self._local_cache.set(full_key, value, ttl)
+        return value
     
     async def set(
         self,
         key: str,
         value: T,
-        expire: Optional[timedelta] = None
+        expire: Optional[timedelta] = None,
+        tags: Optional[Sequence[str]] = None
     ) -> None:
-        """Set a value in cache with optional expiration"""
-        await self._redis.set(
-            self._build_key(key),
+        """Set a value in cache with optional expiration.
+        Tagged entries can be dropped together with ``invalidate_tag``"""
+        full_key = self._build_key(key)
+        expire_seconds = int(expire.total_seconds()) if expire else None
+        if tags:
+            await self._redis.set_with_tags(
+                full_key,
+                value,
+                [self._build_tag_key(tag) for tag in tags],
+                expire_seconds=expire_seconds
+            )
+        else:
+            await self._redis.set(full_key, value, expire_seconds=expire_seconds)
+        if self._local_cache is not None:
+            self._local_cache.set(full_key, value, expire_seconds)
+    
+    async def acquire_lease(
+        self,
+        key: str,
+        timeout: timedelta,
+        tags: Optional[Sequence[str]] = None
+    ) -> Optional[str]:
+        """Token for one ``set_with_lease`` of ``key`` within ``timeout``, None
+        while another caller holds the lease. Deleting the key or invalidating
+        any of ``tags`` revokes it, so a value read before that is never
+        stored after it"""
+        token = uuid4().hex
+        acquired = await self._redis.acquire_lock(
+            self._build_lease_key(key),
+            token,
+            timeout.total_seconds(),
+            [self._build_tag_key(tag) for tag in tags or ()]
+        )
+        return token if acquired else None
+    
+    async def set_with_lease(
+        self,
+        key: str,
+        value: T,
+        token: str,
+        expire: Optional[timedelta] = None,
+        tags: Optional[Sequence[str]] = None
+    ) -> bool:
+        """Set a value, tagged with ``tags``, only if the lease ``token`` was
+        not revoked or expired. Returns whether the value was set"""
+        full_key = self._build_key(key)
+        expire_seconds = int(expire.total_seconds()) if expire else None
+        stored = await self._redis.set_if_locked(
+            full_key,
             value,
-            expire_seconds=int(expire.total_seconds()) if expire else None
+            self._build_lease_key(key),
+            token,
+            expire_seconds=expire_seconds,
+            tag_keys=[self._build_tag_key(tag) for tag in tags or ()]
         )
+        if stored and self._local_cache is not None:
+            self._local_cache.set(full_key, value, expire_seconds)
+        return stored
+    
+    async def release_lease(self, key: str, token: str) -> None:
+        """Give up a lease without setting the value"""
+        await self._redis.release_lock(self._build_lease_key(key), token)
     
     async def delete(self, key: str) -> None:
-        """Delete a value from cache"""
-        await self._redis.delete(self._build_key(key))
+        """Delete a value from cache, revoking its lease"""
+        full_key = self._build_key(key)
+        if self._local_cache is not None:
+            self._local_cache.invalidate(full_key)
+        await self._redis.delete_many([full_key, self._build_lease_key(key)])
     
     async def exists(self, key: str) -> bool:
         """Check if a key exists in cache"""
         return await self._redis.exists(self._build_key(key))
     
+    async def invalidate_tag(self, tag: str) -> int:
+        """Delete every entry stored with ``tag``"""
+        return await self.invalidate_tags([tag])
+    
+    async def invalidate_tags(self, tags: Sequence[str]) -> int:
+        """Delete every entry stored with any of ``tags`` in a single call"""
+        deleted = await self._redis.invalidate_tags([self._build_tag_key(tag) for tag in tags])
+        # Tags also hold the leases taken with them, which are only revoked
+        lease_prefix = self._build_lease_key('')
+        deleted = [full_key for full_key in deleted if not full_key.startswith(lease_prefix)]
+        if self._local_cache is not None:
+            for full_key in deleted:
+                self._local_cache.invalidate(full_key)
+        return len(deleted)
+    
+    async def invalidate_prefix(self, prefix: str) -> int:
+        """Delete every entry whose key starts with ``prefix`` using incremental SCAN"""
+        full_prefix = self._build_key(prefix)
+        if self._local_cache is not None:
+            self._local_cache.invalidate_prefix(full_prefix)
+        return await self._redis.delete_matching(_GLOB_SPECIAL_CHARS.sub(r'\\\1', full_prefix) + '*')
+    
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, Optional[T]]:
+        """Get several values from cache, going to Redis only for local misses"""
+        values: Dict[str, Optional[T]] = {}
+        missing: List[str] = []
+        for key in keys:
+            value = self._local_cache.get(self._build_key(key)) if self._local_cache is not None else None
+            if value is None:
+                missing.append(key)
+            values[key] = value
+        
+        if not missing:
+            return values
+        
+        full_keys = [self._build_key(key) for key in missing]
+        if self._local_cache is None:
+            entries = [(value, None) for value in await self._redis.get_many(full_keys)]
+        else:
+            entries = await self._redis.get_many_with_ttl(full_keys)
+        
+        for key, full_key, (value, ttl) in zip(missing, full_keys, entries):
+            self._record_redis_lookup(value)
+            if value is not None and self._local_cache is not None:
+                self._local_cache.set(full_key, value, ttl)
+            values[key] = value
+        return {key: self._unwrap(value) for key, value in values.items()}
+    
+    async def set_many(
+        self,
+        items: Dict[str, T],
+        expire: Optional[timedelta] = None,
+        expire_by_key: Optional[Dict[str, timedelta]] = None
+    ) -> None:
+        """Set several values in cache; ``expire_by_key`` overrides ``expire`` per key"""
+        expire_seconds = int(expire.total_seconds()) if expire else None
+        expire_seconds_by_key = {
+            self._build_key(key): int(key_expire.total_seconds()) if key_expire else None
+            for key, key_expire in (expire_by_key or {}).items()
+        }
+        full_items = {self._build_key(key): value for key, value in items.items()}
+        await self._redis.set_many(full_items, expire_seconds, expire_seconds_by_key)
+        
+        if self._local_cache is not None:
+            for full_key, value in full_items.items():
+                self._local_cache.set(full_key, value, expire_seconds_by_key.get(full_key, expire_seconds))
+    
+    async def delete_many(self, keys: Sequence[str]) -> int:
+        """Delete several values from cache, revoking their leases"""
+        full_keys = [self._build_key(key) for key in keys]
+        if self._local_cache is not None:
+            for full_key in full_keys:
+                self._local_cache.invalidate(full_key)
+        await self._redis.delete_many([self._build_lease_key(key) for key in keys])
+        return await self._redis.delete_many(full_keys)
+    
+    async def exists_many(self, keys: Sequence[str]) -> Dict[str, bool]:
+        """Check which keys exist in cache"""
+        found = await self._redis.exists_many([self._build_key(key) for key in keys])
+        return dict(zip(keys, found))
+    
+    async def get_or_set(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[T]],
+        expire: Optional[timedelta] = None,
+        tags: Optional[Sequence[str]] = None
+    ) -> T:
+        """Get a value from cache or compute it with ``factory``.
+        Keys written here hold an envelope with the value and its refresh metadata"""
+        entry = await self._get_entry(key)
+        if entry is not None:
+            if not self._is_envelope(entry):
+                return entry
+            if self._needs_refresh(entry):
+                self._refresh_in_background(key, factory, expire, tags)
+            return entry['value']
+        
+        return await asyncio.shield(self._compute_once(key, factory, expire, tags))
+    
     async def cached(
         self,
         func: Callable[..., Awaitable[T]],
@@ -61,19 +314,122 @@ class CacheService(Generic[T]):
         *args,
         **kwargs
     ) -> T:
-        """Decorator for caching function results"""
-        cache_key = self._generate_key(*args, **kwargs)
+        """Cache the result of calling ``func`` with the given arguments.
+        See ``cache_decorator.cached`` for the decorator form"""
+        cache_key = function_cache_key(func, *args, **kwargs)
+        return await self.get_or_set(cache_key, partial(func, *args, **kwargs), expire)
+    
+    @staticmethod
+    def _is_envelope(entry: Any) -> bool:
+        return isinstance(entry, dict) and entry.get(ENVELOPE_MARKER) == 1
+    
+    @classmethod
+    def _unwrap(cls, entry: Any) -> Any:
+        return entry['value'] if cls._is_envelope(entry) else entry
+    
+    def _needs_refresh(self, entry: Dict[str, Any]) -> bool:
+        """Stale entries always refresh; fresh ones refresh early with a probability
+        that grows as expiry approaches and with the cost of the computation (XFetch)"""
+        expires_at = entry['expires_at']
+        if expires_at is None:
+            return False
+        now = time.time()
+        if now >= expires_at:
+            return True
+        if self._early_refresh_beta <= 0:
+            return False
+        jitter = -math.log(1.0 - random.random())
+        return now + entry.get('delta', 0) * self._early_refresh_beta * jitter >= expires_at
+    
+    def _compute_once(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[T]],
+        expire: Optional[timedelta],
+        tags: Optional[Sequence[str]],
+        background: bool = False
+    ) -> asyncio.Future:
+        """Return the in-flight computation for ``key``, starting one if needed"""
+        inflight = self._refreshing if background else self._inflight
+        task = inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(key, factory, expire, tags, background))
+            inflight[key] = task
+            task.add_done_callback(lambda _: inflight.pop(key, None))
+        return task
+    
+    def _refresh_in_background(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[T]],
+        expire: Optional[timedelta],
+        tags: Optional[Sequence[str]]
+    ) -> None:
+        if key in self._inflight or key in self._refreshing:
+            return
+        task = self._compute_once(key, factory, expire, tags, background=True)
+        task.add_done_callback(self._log_refresh_error)
+    
+    @staticmethod
+    def _log_refresh_error(task: asyncio.Future) -> None:
+        if not task.cancelled() and task.exception():
+            logger.error(f"Error refreshing cache entry: {str(task.exception())}")
+    
+    async def _compute(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[T]],
+        expire: Optional[timedelta],
+        tags: Optional[Sequence[str]],
+        background: bool
+    ) -> Optional[T]:
+        if not self._distributed_lock:
+            return await self._compute_and_store(key, factory, expire, tags)
+        
+        lock_key = self._build_key(f"lock:{key}")
+        token = uuid4().hex
+        if await self._redis.acquire_lock(lock_key, token, self._lock_timeout):
+            try:
+                return await self._compute_and_store(key, factory, expire, tags)
+            finally:
+                await self._redis.release_lock(lock_key, token)
+        
+        # Another worker is already computing this key; the stale entry is
+        # still served meanwhile
+        if background:
+            return None
         
-        # Try to get from cache first
-        cached_value = await self.get(cache_key)
-        if cached_value is not None:
-            return cached_value
+        deadline = time.monotonic() + self._lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self._lock_poll_interval)
+            entry = await self._get_entry(key)
+            if entry is not None:
+                return self._unwrap(entry)
         
-        # If not in cache, execute function
-        result = await func(*args, **kwargs)
+        # The lock holder did not finish in time, compute it ourselves
+        return await self._compute_and_store(key, factory, expire, tags)
+    
+    async def _compute_and_store(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[T]],
+        expire: Optional[timedelta],
+        tags: Optional[Sequence[str]]
+    ) -> T:
+        started = time.monotonic()
+        result = await factory()
+        delta = time.monotonic() - started
         
         # Store in cache if we have a result
         if result is not None:
-            await self.set(cache_key, result, expire)
+            envelope = {
+                ENVELOPE_MARKER: 1,
+                'value': result,
+                'delta': delta,
+                'expires_at': time.time() + expire.total_seconds() if expire else None
+            }
+            if expire and self._stale_ttl:
+                expire = expire + self._stale_ttl
+            await self.set(key, envelope, expire, tags)
         
         return result
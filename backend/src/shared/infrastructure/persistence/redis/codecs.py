@@ -0,0 +1,377 @@
+from abc import ABC, abstractmethod
+from dataclasses import is_dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from uuid import UUID
+import base64
+import json
+import zlib
+from ....domain.response import Response
+from ....domain.value_object.value_object import ValueObject, instance_state
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # optional dependency
+    lz4_frame = None
+
+
+# Header byte: low bits select the serialization format, high bits the
+# compression. Every valid header is below 0x20, so values written before
+# the codec layer existed (printable JSON or text) can still be told apart.
+FORMAT_BYTES = 0x01
+FORMAT_STR = 0x02
+FORMAT_JSON = 0x03
+FORMAT_MSGPACK = 0x05
+FORMAT_MASK = 0x07
+
+COMPRESSION_ZLIB = 0x08
+COMPRESSION_LZ4 = 0x10
+COMPRESSION_MASK = 0x18
+
+
+class CodecError(ValueError):
+    """Error for values that cannot be encoded or decoded"""
+    pass
+
+
+class CacheableTypes:
+    """Dataclasses the codecs may rebuild from cached values.
+
+    A cached dataclass only names its class, so reading a value written by
+    anyone with access to Redis must not import modules or instantiate
+    arbitrary classes. Decoding resolves the name against the registered
+    classes and the already imported subclasses of the bases registered
+    with ``subclasses=True``; any other name raises CodecError, and so does
+    encoding an unregistered dataclass.
+    """
+
+    def __init__(self):
+        self._types: Dict[str, type] = {}
+        self._bases: List[type] = []
+
+    @staticmethod
+    def path(cls: type) -> str:
+        return f"{cls.__module__}:{cls.__qualname__}"
+
+    def register(self, cls: Type[Any], subclasses: bool = False) -> Type[Any]:
+        """Allow ``cls``, and its subclasses with ``subclasses``. Returns the
+        class so it can be used as a decorator"""
+        if not (isinstance(cls, type) and is_dataclass(cls)):
+            raise ValueError(f"{cls!r} is not a dataclass")
+        if '<locals>' in cls.__qualname__:
+            raise ValueError(f"Dataclass {cls.__qualname__} must be defined at module level to be cached")
+        self._types[self.path(cls)] = cls
+        if subclasses:
+            self._bases.append(cls)
+        return cls
+
+    def get(self, path: str) -> type:
+        cls = self._types.get(path)
+        if cls is None:
+            cls = self._find_subclass(path, self._bases)
+            if cls is None:
+                raise CodecError(f"{path} is not registered as a cacheable type")
+            self._types[path] = cls
+        return cls
+
+    def _find_subclass(self, path: str, bases: List[type]) -> Optional[type]:
+        for base in bases:
+            for subclass in base.__subclasses__():
+                if self.path(subclass) == path and is_dataclass(subclass):
+                    return subclass
+                found = self._find_subclass(path, [subclass])
+                if found is not None:
+                    return found
+        return None
+
+
+# Query responses and value objects are cacheable by default
+cacheable_types = CacheableTypes()
+cacheable_types.register(Response, subclasses=True)
+cacheable_types.register(ValueObject, subclasses=True)
+
+
+def cacheable(cls: Type[Any]) -> Type[Any]:
+    """Class decorator allowing a dataclass to be stored in the cache"""
+    return cacheable_types.register(cls)
+
+
+def _dataclass_state(value: Any) -> Tuple[str, Dict[str, Any]]:
+    """Class path and attributes of a dataclass instance (query responses, value objects),
+    including state kept outside fields such as the slot of DateTime"""
+    cls = type(value)
+    if '<locals>' in cls.__qualname__:
+        raise CodecError(f"Dataclass {cls.__qualname__} must be defined at module level to be cached")
+    path = CacheableTypes.path(cls)
+    if cacheable_types.get(path) is not cls:
+        raise CodecError(f"{path} is not registered as a cacheable type")
+    return path, instance_state(value)
+
+
+def _dataclass_from_state(path: str, state: Dict[str, Any]) -> Any:
+    """Rebuild a registered dataclass without running __init__/__post_init__,
+    so frozen and slotted classes come back exactly as they were stored"""
+    instance = object.__new__(cacheable_types.get(path))
+    for name, item in state.items():
+        object.__setattr__(instance, name, item)
+    return instance
+
+
+def _extended_to_primitive(value: Any) -> Any:
+    """Tagged representation for types JSON cannot keep"""
+    if isinstance(value, datetime):
+        return {'__type__': 'datetime', '__value__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__type__': 'date', '__value__': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'__type__': 'decimal', '__value__': str(value)}
+    if isinstance(value, UUID):
+        return {'__type__': 'uuid', '__value__': str(value)}
+    if isinstance(value, (set, frozenset)):
+        return {'__type__': type(value).__name__, '__value__': list(value)}
+    if isinstance(value, bytes):
+        return {'__type__': 'bytes', '__value__': base64.b64encode(value).decode()}
+    if is_dataclass(value) and not isinstance(value, type):
+        path, state = _dataclass_state(value)
+        return {'__type__': 'dataclass', '__class__': path, '__value__': state}
+    raise CodecError(f"Object of type {type(value).__name__} cannot be cached")
+
+
+_PRIMITIVE_TO_EXTENDED: Dict[str, Callable[[Any], Any]] = {
+    'datetime': datetime.fromisoformat,
+    'date': date.fromisoformat,
+    'decimal': Decimal,
+    'uuid': UUID,
+    'set': set,
+    'frozenset': frozenset,
+    'bytes': base64.b64decode,
+}
+
+
+def _primitive_to_extended(obj: Dict[str, Any]) -> Any:
+    type_name = obj.get('__type__')
+    if type_name == 'dataclass' and '__class__' in obj:
+        return _dataclass_from_state(obj['__class__'], obj['__value__'])
+    if type_name in _PRIMITIVE_TO_EXTENDED and '__value__' in obj:
+        return _PRIMITIVE_TO_EXTENDED[type_name](obj['__value__'])
+    return obj
+
+
+class Serializer(ABC):
+    """Turns values into bytes. ``FORMAT`` is stored in the header byte"""
+    FORMAT: int
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        pass
+
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        pass
+
+
+class JsonSerializer(Serializer):
+    """Standard library JSON with tagged datetimes, Decimals, UUIDs, sets, bytes and dataclasses"""
+    FORMAT = FORMAT_JSON
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, default=_extended_to_primitive, separators=(',', ':')).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data, object_hook=_primitive_to_extended)
+
+
+class MsgpackSerializer(Serializer):
+    """Binary MessagePack with extension types for datetimes, Decimals, UUIDs, sets and dataclasses"""
+    FORMAT = FORMAT_MSGPACK
+
+    _EXT_DATETIME = 1
+    _EXT_DATE = 2
+    _EXT_DECIMAL = 3
+    _EXT_UUID = 4
+    _EXT_SET = 5
+    _EXT_FROZENSET = 6
+    _EXT_DATACLASS = 7
+
+    def __init__(self):
+        if msgpack is None:
+            raise CodecError("msgpack is not installed")
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=self._default, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, ext_hook=self._ext_hook, raw=False, strict_map_key=False)
+
+    def _default(self, value: Any) -> Any:
+        if isinstance(value, datetime):
+            return msgpack.ExtType(self._EXT_DATETIME, value.isoformat().encode())
+        if isinstance(value, date):
+            return msgpack.ExtType(self._EXT_DATE, value.isoformat().encode())
+        if isinstance(value, Decimal):
+            return msgpack.ExtType(self._EXT_DECIMAL, str(value).encode())
+        if isinstance(value, UUID):
+            return msgpack.ExtType(self._EXT_UUID, value.bytes)
+        if isinstance(value, set):
+            return msgpack.ExtType(self._EXT_SET, self.dumps(list(value)))
+        if isinstance(value, frozenset):
+            return msgpack.ExtType(self._EXT_FROZENSET, self.dumps(list(value)))
+        if is_dataclass(value) and not isinstance(value, type):
+            return msgpack.ExtType(self._EXT_DATACLASS, self.dumps(_dataclass_state(value)))
+        raise CodecError(f"Object of type {type(value).__name__} cannot be cached")
+
+    def _ext_hook(self, code: int, data: bytes) -> Any:
+        if code == self._EXT_DATETIME:
+            return datetime.fromisoformat(data.decode())
+        if code == self._EXT_DATE:
+            return date.fromisoformat(data.decode())
+        if code == self._EXT_DECIMAL:
+            return Decimal(data.decode())
+        if code == self._EXT_UUID:
+            return UUID(bytes=data)
+        if code == self._EXT_SET:
+            return set(self.loads(data))
+        if code == self._EXT_FROZENSET:
+            return frozenset(self.loads(data))
+        if code == self._EXT_DATACLASS:
+            return _dataclass_from_state(*self.loads(data))
+        return msgpack.ExtType(code, data)
+
+
+class Compressor(ABC):
+    """Compresses encoded payloads. ``FLAG`` is stored in the header byte"""
+    FLAG: int
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        pass
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes:
+        pass
+
+
+class ZlibCompressor(Compressor):
+    FLAG = COMPRESSION_ZLIB
+
+    def __init__(self, level: int = 1):
+        self._level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self._level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class Lz4Compressor(Compressor):
+    FLAG = COMPRESSION_LZ4
+
+    def __init__(self):
+        if lz4_frame is None:
+            raise CodecError("lz4 is not installed")
+
+    def compress(self, data: bytes) -> bytes:
+        return lz4_frame.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return lz4_frame.decompress(data)
+
+
+def _default_serializer() -> Serializer:
+    return MsgpackSerializer() if msgpack is not None else JsonSerializer()
+
+
+def _default_compressor() -> Compressor:
+    return Lz4Compressor() if lz4_frame is not None else ZlibCompressor()
+
+
+class ValueCodec:
+    """Encodes cache values as ``<header byte><payload>``.
+
+    Strings and bytes are stored as-is, everything else goes through the
+    configured serializer (MessagePack when installed, JSON otherwise).
+    Module-level dataclasses such as query responses are stored with their
+    class path and rebuilt field by field.
+    Payloads of at least ``compress_threshold`` bytes are compressed when
+    that makes them smaller. Decoding reads the header instead of guessing,
+    so any worker can read values written with another serializer or
+    compressor as long as the library is installed.
+    """
+
+    def __init__(
+        self,
+        serializer: Optional[Serializer] = None,
+        compressor: Optional[Compressor] = None,
+        compress_threshold: Optional[int] = 1024
+    ):
+        self._serializer = serializer or _default_serializer()
+        self._compressor = compressor or _default_compressor()
+        self._compress_threshold = compress_threshold
+        self._serializers: Dict[int, Serializer] = {
+            FORMAT_JSON: JsonSerializer(),
+            self._serializer.FORMAT: self._serializer,
+        }
+        if msgpack is not None:
+            self._serializers.setdefault(FORMAT_MSGPACK, MsgpackSerializer())
+        self._compressors: Dict[int, Compressor] = {
+            COMPRESSION_ZLIB: ZlibCompressor(),
+            self._compressor.FLAG: self._compressor,
+        }
+        if lz4_frame is not None:
+            self._compressors.setdefault(COMPRESSION_LZ4, Lz4Compressor())
+
+    def encode(self, value: Any) -> bytes:
+        if isinstance(value, str):
+            header, payload = FORMAT_STR, value.encode()
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            header, payload = FORMAT_BYTES, bytes(value)
+        else:
+            header, payload = self._serializer.FORMAT, self._serializer.dumps(value)
+
+        if self._compress_threshold is not None and len(payload) >= self._compress_threshold:
+            compressed = self._compressor.compress(payload)
+            if len(compressed) < len(payload):
+                header, payload = header | self._compressor.FLAG, compressed
+
+        return bytes((header,)) + payload
+
+    def decode(self, data: bytes) -> Any:
+        if not data or data[0] >= 0x20:
+            return self._decode_legacy(data)
+
+        header = data[0]
+        payload = memoryview(data)[1:]
+        compression = header & COMPRESSION_MASK
+        if compression:
+            compressor = self._compressors.get(compression)
+            if compressor is None:
+                raise CodecError(f"Unsupported compression in header {header:#04x}")
+            payload = compressor.decompress(payload)
+
+        format_ = header & FORMAT_MASK
+        if format_ == FORMAT_STR:
+            return bytes(payload).decode()
+        if format_ == FORMAT_BYTES:
+            return bytes(payload)
+        serializer = self._serializers.get(format_)
+        if serializer is None:
+            raise CodecError(f"Unsupported format in header {header:#04x}")
+        return serializer.loads(bytes(payload))
+
+    @staticmethod
+    def _decode_legacy(data: bytes) -> Any:
+        """Values written as plain JSON or text before the codec layer"""
+        if not data:
+            return None
+        text = data.decode()
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return text
@@ -0,0 +1,77 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+import time
+
+
+@dataclass
+class CacheStats:
+    """Hit and miss counters for a cache tier"""
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_primitives(self) -> Dict[str, Any]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hit_ratio
+        }
+
+
+class LocalCache:
+    """Bounded in-process LRU cache with per-entry TTL.
+
+    Used as the L1 tier in front of Redis. Entries never live longer than
+    ``default_ttl`` seconds, and callers pass a shorter ``ttl`` when the
+    backing Redis key expires sooner.
+    """
+
+    def __init__(self, max_size: int = 1024, default_ttl: float = 60.0):
+        if max_size <= 0:
+            raise ValueError('max_size must be greater than zero')
+        self._max_size = max_size
+        self._default_ttl = default_ttl
+        self._entries: 'OrderedDict[str, Tuple[Any, float]]' = OrderedDict()
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a value, refreshing its LRU position. Expired entries count as misses"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return value
+            del self._entries[key]
+        self.stats.misses += 1
+        return default
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value for at most ``default_ttl`` seconds"""
+        ttl = self._default_ttl if ttl is None else min(ttl, self._default_ttl)
+        if ttl <= 0:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,76 @@
+from typing import Optional
+import asyncio
+import logging
+
+from .local_cache import LocalCache
+from .redis_client import RedisClient
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCacheInvalidator:
+    """Drops L1 entries when their Redis key changes in any worker.
+
+    Listens to keyspace notifications (``__keyspace@<db>__:<prefix>:*``) so
+    sets, deletes, expirations and evictions done by other processes evict
+    the local copy. Requires ``notify-keyspace-events`` to include ``K``
+    plus the generic, string, expired and evicted classes (``Kg$xe``).
+    """
+
+    def __init__(
+        self,
+        redis_client: RedisClient,
+        local_cache: LocalCache,
+        prefix: str,
+        reconnect_delay: float = 1.0
+    ):
+        self._redis = redis_client
+        self._local_cache = local_cache
+        self._prefix = prefix
+        self._reconnect_delay = reconnect_delay
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def _channel_prefix(self) -> str:
+        return f"__keyspace@{self._redis.db}__:"
+
+    async def start(self) -> None:
+        """Start listening in a background task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Stop listening"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self) -> None:
+        pattern = f"{self._channel_prefix}{self._prefix}:*"
+        while True:
+            pubsub = await self._redis.pubsub()
+            try:
+                await pubsub.psubscribe(pattern)
+                async for message in pubsub.listen():
+                    self._handle(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Invalidations may have been missed while disconnected
+                logger.error(f"Cache invalidation listener failed: {str(e)}")
+                self._local_cache.clear()
+                await asyncio.sleep(self._reconnect_delay)
+            finally:
+                await pubsub.close()
+
+    def _handle(self, message: dict) -> None:
+        if message.get('type') != 'pmessage':
+            return
+        channel = message['channel']
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        self._local_cache.invalidate(channel[len(self._channel_prefix):])
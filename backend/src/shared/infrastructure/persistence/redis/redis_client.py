@@ -1,21 +1,125 @@
-from typing import Optional, Any
-import json
+from typing import Optional, Any, AsyncIterator, Dict, Iterator, List, Sequence, Tuple
 from redis.asyncio import Redis, ConnectionPool
+from redis.asyncio.client import PubSub
+from redis.commands.core import AsyncScript
 from ...config import Config
+from .codecs import ValueCodec
+
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Tags are sorted sets of keys scored by the time each one expires, in
+# milliseconds (+inf without expiration). Every write drops the members
+# already expired, so a tag never holds more than its live keys, and makes
+# the tag expire with its longest-lived member.
+_ADD_TO_TAGS = """
+local function add_to_tags(key, first_tag, ttl_ms)
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+    local expires_at = '+inf'
+    if ttl_ms > 0 then
+        expires_at = now + ttl_ms
+    end
+    for i = first_tag, #KEYS do
+        redis.call('ZADD', KEYS[i], expires_at, key)
+        redis.call('ZREMRANGEBYSCORE', KEYS[i], '-inf', now)
+        if redis.call('ZCOUNT', KEYS[i], '+inf', '+inf') > 0 then
+            redis.call('PERSIST', KEYS[i])
+        else
+            local last = redis.call('ZRANGE', KEYS[i], -1, -1, 'WITHSCORES')
+            redis.call('PEXPIREAT', KEYS[i], last[2])
+        end
+    end
+end
+"""
+
+_ACQUIRE_LOCK_WITH_TAGS_SCRIPT = _ADD_TO_TAGS + """
+if not redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return 0
+end
+add_to_tags(KEYS[1], 2, tonumber(ARGV[2]))
+return 1
+"""
+
+_SET_IF_LOCKED_SCRIPT = _ADD_TO_TAGS + """
+if redis.call('get', KEYS[2]) ~= ARGV[2] then
+    return 0
+end
+local ttl = tonumber(ARGV[3])
+if ttl > 0 then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ttl)
+else
+    redis.call('SET', KEYS[1], ARGV[1])
+end
+redis.call('DEL', KEYS[2])
+add_to_tags(KEYS[1], 3, ttl * 1000)
+return 1
+"""
+
+_SET_WITH_TAGS_SCRIPT = _ADD_TO_TAGS + """
+local ttl = tonumber(ARGV[2])
+if ttl > 0 then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ttl)
+else
+    redis.call('SET', KEYS[1], ARGV[1])
+end
+add_to_tags(KEYS[1], 2, ttl * 1000)
+return 1
+"""
+
+_INVALIDATE_TAGS_SCRIPT = """
+local deleted = {}
+for i = 1, #KEYS do
+    local members = redis.call('ZRANGE', KEYS[i], 0, -1)
+    for j = 1, #members, 1000 do
+        redis.call('UNLINK', unpack(members, j, math.min(j + 999, #members)))
+    end
+    for _, member in ipairs(members) do
+        table.insert(deleted, member)
+    end
+    redis.call('UNLINK', KEYS[i])
+end
+return deleted
+"""
 
 
 class RedisClient:
-    """Redis client wrapper for caching and session management"""
+    """Redis client wrapper for caching and session management.
+
+    Values are stored as bytes produced by ``codec`` (see ``ValueCodec``),
+    so the connection does not decode responses.
+    """
     
-    def __init__(self, config: Config):
+    def __init__(
+        self,
+        config: Config,
+        batch_size: int = 500,
+        codec: Optional[ValueCodec] = None
+    ):
+        if batch_size <= 0:
+            raise ValueError('batch_size must be greater than zero')
+        self._batch_size = batch_size
+        self._codec = codec or ValueCodec()
         self._pool = ConnectionPool(
             host=config.REDIS_HOST,
             port=config.REDIS_PORT,
             db=config.REDIS_DB,
             password=config.REDIS_PASSWORD,
-            decode_responses=True
+            decode_responses=False
         )
+        self._db = config.REDIS_DB
         self._redis: Optional[Redis] = None
+        self._scripts: Dict[str, AsyncScript] = {}
+    
+    @property
+    def db(self) -> int:
+        """Database index, used to build keyspace notification channels"""
+        return self._db
     
     async def connect(self) -> None:
         """Connect to Redis"""
@@ -27,19 +131,77 @@ class RedisClient:
         if self._redis:
             await self._redis.close()
             self._redis = None
+            self._scripts.clear()
+    
+    def _encode(self, value: Any) -> bytes:
+        return self._codec.encode(value)
+    
+    def _decode(self, value: Optional[bytes]) -> Optional[Any]:
+        return self._codec.decode(value) if value is not None else None
+    
+    @staticmethod
+    def _to_ttl(pttl: int) -> Optional[float]:
+        return pttl / 1000 if pttl >= 0 else None
+    
+    def _script(self, source: str) -> AsyncScript:
+        """Scripts run by SHA after the first call"""
+        script = self._scripts.get(source)
+        if script is None:
+            script = self._scripts[source] = self._redis.register_script(source)
+        return script
+    
+    def _chunks(self, items: Sequence[Any]) -> Iterator[Sequence[Any]]:
+        """Split bulk operations so a single command never blocks Redis for long"""
+        for start in range(0, len(items), self._batch_size):
+            yield items[start:start + self._batch_size]
     
     async def get(self, key: str) -> Optional[Any]:
         """Get a value from Redis"""
         if not self._redis:
             await self.connect()
         
-        value = await self._redis.get(key)
-        if value:
-            try:
-                return json.loads(value)
-            except json.JSONDecodeError:
-                return value
-        return None
+        return self._decode(await self._redis.get(key))
+    
+    async def get_with_ttl(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        """Get a value and its remaining TTL in seconds in a single round-trip.
+        The TTL is None when the key has no expiration"""
+        if not self._redis:
+            await self.connect()
+        
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.pttl(key)
+            value, pttl = await pipe.execute()
+        
+        value = self._decode(value)
+        return value, (self._to_ttl(pttl) if value is not None else None)
+    
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[Any]]:
+        """Get several values with one MGET per batch, in the order of ``keys``"""
+        if not self._redis:
+            await self.connect()
+        
+        values: List[Optional[Any]] = []
+        for chunk in self._chunks(keys):
+            values.extend(self._decode(value) for value in await self._redis.mget(chunk))
+        return values
+    
+    async def get_many_with_ttl(self, keys: Sequence[str]) -> List[Tuple[Optional[Any], Optional[float]]]:
+        """Get several values and their remaining TTLs with one pipeline per batch"""
+        if not self._redis:
+            await self.connect()
+        
+        entries: List[Tuple[Optional[Any], Optional[float]]] = []
+        for chunk in self._chunks(keys):
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for key in chunk:
+                    pipe.get(key)
+                    pipe.pttl(key)
+                results = await pipe.execute()
+            for value, pttl in zip(results[::2], results[1::2]):
+                value = self._decode(value)
+                entries.append((value, self._to_ttl(pttl) if value is not None else None))
+        return entries
     
     async def set(
         self,
@@ -51,14 +213,32 @@ class RedisClient:
         if not self._redis:
             await self.connect()
         
-        if isinstance(value, (dict, list)):
-            value = json.dumps(value)
+        value = self._encode(value)
         
         if expire_seconds:
             await self._redis.setex(key, expire_seconds, value)
         else:
             await self._redis.set(key, value)
     
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        expire_seconds: Optional[int] = None,
+        expire_seconds_by_key: Optional[Dict[str, Optional[int]]] = None
+    ) -> None:
+        """Set several values with one pipeline per batch.
+        ``expire_seconds_by_key`` overrides ``expire_seconds`` for individual keys"""
+        if not self._redis:
+            await self.connect()
+        
+        expire_seconds_by_key = expire_seconds_by_key or {}
+        for chunk in self._chunks(list(items.items())):
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for key, value in chunk:
+                    expire = expire_seconds_by_key.get(key, expire_seconds)
+                    pipe.set(key, self._encode(value), ex=expire or None)
+                await pipe.execute()
+    
     async def delete(self, key: str) -> None:
         """Delete a key from Redis"""
         if not self._redis:
@@ -72,3 +252,139 @@ class RedisClient:
             await self.connect()
         
         return await self._redis.exists(key) > 0
+    
+    async def delete_many(self, keys: Sequence[str]) -> int:
+        """Delete several keys, freeing memory in the background (UNLINK).
+        Returns the number of keys removed"""
+        if not self._redis:
+            await self.connect()
+        
+        deleted = 0
+        for chunk in self._chunks(keys):
+            deleted += await self._redis.unlink(*chunk)
+        return deleted
+    
+    async def exists_many(self, keys: Sequence[str]) -> List[bool]:
+        """Check several keys with one pipeline per batch, in the order of ``keys``"""
+        if not self._redis:
+            await self.connect()
+        
+        found: List[bool] = []
+        for chunk in self._chunks(keys):
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for key in chunk:
+                    pipe.exists(key)
+                found.extend(count > 0 for count in await pipe.execute())
+        return found
+    
+    async def acquire_lock(
+        self,
+        key: str,
+        token: str,
+        timeout_seconds: float,
+        tag_keys: Sequence[str] = ()
+    ) -> bool:
+        """Try to take a lock owned by ``token``. It expires after the timeout.
+        With ``tag_keys`` the lock is added to those tags in the same call,
+        so invalidating any of them releases it"""
+        if not self._redis:
+            await self.connect()
+        
+        timeout_ms = int(timeout_seconds * 1000)
+        if not tag_keys:
+            return bool(await self._redis.set(key, token, nx=True, px=timeout_ms))
+        return bool(await self._script(_ACQUIRE_LOCK_WITH_TAGS_SCRIPT)(
+            keys=[key, *tag_keys],
+            args=[token, timeout_ms]
+        ))
+    
+    async def release_lock(self, key: str, token: str) -> bool:
+        """Release a lock only if it is still owned by ``token``"""
+        if not self._redis:
+            await self.connect()
+        
+        return bool(await self._script(_RELEASE_LOCK_SCRIPT)(keys=[key], args=[token]))
+    
+    async def set_if_locked(
+        self,
+        key: str,
+        value: Any,
+        lock_key: str,
+        token: str,
+        expire_seconds: Optional[int] = None,
+        tag_keys: Sequence[str] = ()
+    ) -> bool:
+        """Set a value, add it to ``tag_keys`` and release the lock in one
+        atomic call, only if the lock is still owned by ``token``. Returns
+        whether the value was set"""
+        if not self._redis:
+            await self.connect()
+        
+        return bool(await self._script(_SET_IF_LOCKED_SCRIPT)(
+            keys=[key, lock_key, *tag_keys],
+            args=[self._encode(value), token, expire_seconds or 0]
+        ))
+    
+    async def set_with_tags(
+        self,
+        key: str,
+        value: Any,
+        tag_keys: Sequence[str],
+        expire_seconds: Optional[int] = None
+    ) -> None:
+        """Set a value and add its key to the tags in one atomic call.
+        Expired keys are dropped from the tags written, and each tag
+        expires together with its longest-lived member"""
+        if not self._redis:
+            await self.connect()
+        
+        await self._script(_SET_WITH_TAGS_SCRIPT)(
+            keys=[key, *tag_keys],
+            args=[self._encode(value), expire_seconds or 0]
+        )
+    
+    async def invalidate_tags(self, tag_keys: Sequence[str]) -> List[str]:
+        """Delete every member of the tags and the tags themselves in one call.
+        Returns the deleted member keys"""
+        if not self._redis:
+            await self.connect()
+        
+        members = await self._script(_INVALIDATE_TAGS_SCRIPT)(keys=list(tag_keys))
+        return [member.decode() if isinstance(member, bytes) else member for member in members]
+    
+    async def scan(self, match: str, count: Optional[int] = None) -> AsyncIterator[List[str]]:
+        """Iterate incrementally over keys matching a glob pattern, one batch at a time.
+        Unlike KEYS this never blocks Redis; keys may be yielded more than once"""
+        if not self._redis:
+            await self.connect()
+        
+        cursor = 0
+        while True:
+            cursor, keys = await self._redis.scan(cursor, match=match, count=count or self._batch_size)
+            if keys:
+                yield [key.decode() if isinstance(key, bytes) else key for key in keys]
+            if cursor == 0:
+                break
+    
+    async def delete_matching(self, match: str) -> int:
+        """Delete keys matching a glob pattern using incremental SCAN batches.
+        Returns the number of keys removed"""
+        deleted = 0
+        async for keys in self.scan(match):
+            deleted += await self.delete_many(keys)
+        return deleted
+    
+    async def pubsub(self) -> PubSub:
+        """Create a pub/sub connection from the pool"""
+        if not self._redis:
+            await self.connect()
+        
+        return self._redis.pubsub(ignore_subscribe_messages=True)
+    
+    async def enable_keyspace_notifications(self, flags: str = "Kg$xe") -> None:
+        """Enable keyspace notifications (generic, string, expired and evicted events).
+        Managed Redis instances may forbid CONFIG; set notify-keyspace-events there instead"""
+        if not self._redis:
+            await self.connect()
+        
+        await self._redis.config_set("notify-keyspace-events", flags)
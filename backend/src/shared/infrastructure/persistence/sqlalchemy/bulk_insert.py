@@ -0,0 +1,149 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import inspect, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Dialects with INSERT ... ON CONFLICT
+_UPSERT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+# Columns an upsert keeps from the existing row unless asked to update them
+_INSERT_ONLY_COLUMNS = ('created_at',)
+
+
+def model_row(model: Any) -> Dict[str, Any]:
+    """Column values of an unsaved model, with the Python-side defaults
+    the ORM would have applied on flush. Unset columns with a
+    ``server_default`` are left out, so the database fills them"""
+    row = {}
+    for attribute in inspect(type(model)).column_attrs:
+        column = attribute.columns[0]
+        value = getattr(model, attribute.key)
+        default = column.default
+        if value is None and default is not None and not default.is_sequence:
+            value = default.arg(None) if default.is_callable else default.arg
+        if value is None and column.server_default is not None:
+            continue
+        row[column.key] = value
+    return row
+
+
+async def bulk_insert(
+    session: AsyncSession,
+    model_class: type,
+    models: Iterable[Any],
+    chunk_size: int = 500,
+    upsert: bool = False,
+    update_columns: Optional[Iterable[str]] = None
+) -> int:
+    """Insert models in chunks of ``chunk_size`` rows.
+
+    Each chunk is one executemany of the same statement, so it is compiled
+    once and sent as multi-row VALUES by the drivers that support it.
+    With ``upsert`` the statement gets ``ON CONFLICT (primary key) DO
+    UPDATE`` so existing rows take the new values of ``update_columns``
+    (by default every column sent but the primary key and ``created_at``)
+    and a ``version`` column is incremented (PostgreSQL and SQLite).
+    Unset columns with a ``server_default`` are not sent, so new rows get
+    the default and existing rows keep their value.
+    The statements run in the session's transaction and nothing is
+    committed, which is left to the unit of work. Rows go through Core, so
+    instances already loaded in the session are not refreshed.
+    Returns the number of rows sent.
+    """
+    rows = [model_row(model) for model in models]
+    for statement, chunk in _chunks(session, model_class, rows, chunk_size, upsert, update_columns):
+        await session.execute(statement, chunk)
+    return len(rows)
+
+
+async def bulk_insert_returning(
+    session: AsyncSession,
+    model_class: type,
+    models: Iterable[Any],
+    columns: Sequence[str],
+    chunk_size: int = 500,
+    upsert: bool = False,
+    update_columns: Optional[Iterable[str]] = None
+) -> List[Any]:
+    """Like ``bulk_insert``, returning the values of ``columns`` of every
+    written row, e.g. the id and the ``version`` an upsert left. Each chunk
+    is still one statement with ``RETURNING`` (PostgreSQL and SQLite)"""
+    table = inspect(model_class).local_table
+    rows = [model_row(model) for model in models]
+    returned = []
+    for statement, chunk in _chunks(session, model_class, rows, chunk_size, upsert, update_columns):
+        result = await session.execute(statement.returning(*(table.c[key] for key in columns)), chunk)
+        returned.extend(result.all())
+    return returned
+
+
+def _chunks(
+    session: AsyncSession,
+    model_class: type,
+    rows: List[Dict[str, Any]],
+    chunk_size: int,
+    upsert: bool,
+    update_columns: Optional[Iterable[str]]
+) -> Iterator[Tuple[Any, List[Dict[str, Any]]]]:
+    """Statement and rows of each chunk. An executemany sends the same
+    columns for every row, so rows leaving out different server-default
+    columns go in separate chunks, each with its own statement"""
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1')
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(row), []).append(row)
+    for keys, group in groups.items():
+        statement = _insert_statement(session, model_class, keys, upsert, update_columns)
+        for start in range(0, len(group), chunk_size):
+            yield statement, group[start:start + chunk_size]
+
+
+def _insert_statement(
+    session: AsyncSession,
+    model_class: type,
+    keys: Tuple[str, ...],
+    upsert: bool,
+    update_columns: Optional[Iterable[str]]
+) -> Any:
+    """INSERT, or upsert updating the ``keys`` columns sent with the rows"""
+    table = inspect(model_class).local_table
+    if not upsert:
+        return insert(table)
+    dialect = session.get_bind().dialect.name
+    insert_factory = _UPSERT_INSERTS.get(dialect)
+    if insert_factory is None:
+        raise ValueError(f"Upsert is not supported for the {dialect} dialect")
+    statement = insert_factory(table)
+    return statement.on_conflict_do_update(
+        index_elements=[column.name for column in table.primary_key.columns],
+        set_=_upsert_values(table, statement.excluded, keys, update_columns)
+    )
+
+
+def _upsert_values(
+    table: Any,
+    excluded: Any,
+    keys: Tuple[str, ...],
+    update_columns: Optional[Iterable[str]]
+) -> Dict[Any, Any]:
+    if update_columns is None:
+        # Columns left out of the rows keep the existing value rather than the server default
+        update_columns = [
+            column.key for column in table.columns
+            if not column.primary_key and column.key not in _INSERT_ONLY_COLUMNS and column.key in keys
+        ]
+    values = {}
+    for key in update_columns:
+        if key not in table.c:
+            raise ValueError(f"{table.name} has no column {key}")
+        if table.c[key].primary_key:
+            raise ValueError(f"Cannot update the primary key column {key}")
+        values[table.c[key]] = excluded[key]
+    if 'version' in table.c:
+        # The existing row keeps its version history instead of restarting at the insert value
+        values[table.c.version] = table.c.version + 1
+    return values
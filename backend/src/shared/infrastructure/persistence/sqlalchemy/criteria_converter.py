@@ -0,0 +1,143 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Generic, Iterable, List, Optional, Sequence, Tuple, TypeVar
+from sqlalchemy import inspect, select, tuple_
+from sqlalchemy.sql import ColumnElement, Select
+from ....domain.criteria.criteria import Criteria
+from ....domain.criteria.filter import Filter
+from ....domain.criteria.filter_operator import FilterOperator
+from ....domain.criteria.filter_value import FilterValue
+from ....domain.criteria.order_type import OrderType
+
+T = TypeVar('T')
+
+
+@dataclass(frozen=True)
+class Page(Generic[T]):
+    """A page of results. ``next_after`` is passed as ``after`` to fetch the
+    next page and is None on the last one"""
+    items: List[T]
+    next_after: Optional[Tuple[Any, ...]]
+
+
+class CriteriaConverter:
+    """Compiles a domain ``Criteria`` into a SELECT over a model.
+
+    Only the model attributes listed in ``fields`` can be filtered or
+    ordered by; any other field raises ValueError, so criteria built from
+    request parameters cannot reach unindexed or private columns. Filter
+    values are converted to the column's Python type. Results are always
+    ordered by the primary key after the requested order, which keeps
+    pages stable and lets ``after`` seek past the last row of the previous
+    page (keyset pagination) instead of counting an OFFSET. Keyset
+    pagination needs the order column to be NOT NULL and is fastest with
+    an index on (order column, primary key).
+    """
+
+    def __init__(self, model_class: type, fields: Iterable[str]):
+        mapper = inspect(model_class)
+        self._model_class = model_class
+        self._columns = {}
+        for name in fields:
+            if name not in mapper.column_attrs:
+                raise ValueError(f"{model_class.__name__} has no column {name}")
+            self._columns[name] = getattr(model_class, name)
+        self._primary_key = [
+            getattr(model_class, mapper.get_property_by_column(column).key)
+            for column in mapper.primary_key
+        ]
+
+    def select(self, criteria: Criteria, after: Optional[Sequence[Any]] = None) -> Select:
+        """SELECT for ``criteria``. With ``after`` the offset is ignored and
+        the query seeks past that key instead"""
+        statement = select(self._model_class)
+        for criteria_filter in criteria.filters.filters:
+            statement = statement.where(self._condition(criteria_filter))
+
+        keys, descending = self._order_keys(criteria)
+        if after is not None:
+            if len(after) != len(keys):
+                raise ValueError(f"after must have {len(keys)} values")
+            if len(keys) == 1:
+                key, value = keys[0], after[0]
+            else:
+                key, value = tuple_(*keys), tuple_(*after)
+            statement = statement.where(key < value if descending else key > value)
+        statement = statement.order_by(*[key.desc() if descending else key.asc() for key in keys])
+
+        if criteria.offset and after is None:
+            statement = statement.offset(criteria.offset)
+        if criteria.limit is not None:
+            statement = statement.limit(criteria.limit)
+        return statement
+
+    def next_after(self, criteria: Criteria, models: List[Any]) -> Optional[Tuple[Any, ...]]:
+        """Key to fetch the page after ``models``, None if it was the last one"""
+        if not models or criteria.limit is None or len(models) < criteria.limit:
+            return None
+        keys, _ = self._order_keys(criteria)
+        return tuple(getattr(models[-1], key.key) for key in keys)
+
+    def _order_keys(self, criteria: Criteria) -> Tuple[List[Any], bool]:
+        if not criteria.has_order():
+            return list(self._primary_key), False
+        column = self._column(criteria.order.order_by.value)
+        keys = [column] + [key for key in self._primary_key if key is not column]
+        return keys, criteria.order.order_type == OrderType.DESC
+
+    def _column(self, field: str) -> Any:
+        column = self._columns.get(field)
+        if column is None:
+            raise ValueError(f"Field {field} cannot be used in criteria")
+        return column
+
+    def _condition(self, criteria_filter: Filter) -> ColumnElement:
+        column = self._column(criteria_filter.field.value)
+        operator = criteria_filter.operator
+        if operator in (FilterOperator.CONTAINS, FilterOperator.NOT_CONTAINS) and _python_type(column) is not str:
+            raise ValueError(f"Operator {operator.value} can only be used on text fields")
+        if operator == FilterOperator.CONTAINS:
+            return column.contains(criteria_filter.value.value, autoescape=True)
+        if operator == FilterOperator.NOT_CONTAINS:
+            return ~column.contains(criteria_filter.value.value, autoescape=True)
+
+        value = self._value(column, criteria_filter.value)
+        if value is None:
+            if operator == FilterOperator.EQUAL:
+                return column.is_(None)
+            if operator == FilterOperator.NOT_EQUAL:
+                return column.is_not(None)
+            raise ValueError(f"Operator {operator.value} cannot compare with null")
+        if operator == FilterOperator.EQUAL:
+            return column == value
+        if operator == FilterOperator.NOT_EQUAL:
+            return column != value
+        if operator == FilterOperator.GT:
+            return column > value
+        return column < value
+
+    @staticmethod
+    def _value(column: Any, value: FilterValue) -> Any:
+        """Filter value converted to the column type, None for ``null``"""
+        if value.is_null():
+            return None
+        python_type = _python_type(column)
+        if python_type is None:
+            return value.value
+        try:
+            if python_type is bool:
+                return value.to_boolean()
+            if python_type in (datetime, date):
+                return python_type.fromisoformat(value.value)
+            return python_type(value.value)
+        except (ValueError, ArithmeticError):
+            # Decimal raises InvalidOperation, an ArithmeticError
+            raise ValueError(f"Invalid value {value.value} for field {column.key}")
+
+
+def _python_type(column: Any) -> Optional[type]:
+    """Python type of the column's values, None when the type does not declare one"""
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return None
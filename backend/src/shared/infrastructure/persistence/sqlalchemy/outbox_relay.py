@@ -0,0 +1,212 @@
+from datetime import datetime, timedelta
+from typing import Any, Callable, List, Optional, Tuple
+import asyncio
+import json
+import logging
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ....domain.event_bus import EventBus
+from ....domain.events import DomainEvent
+from ...event_bus.domain_event_publish_error import DomainEventPublishError
+from ...event_bus.domain_event_registry import DomainEventRegistry
+from ..postgresql.models import OutboxMessageModel
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """Publishes the events stored in the outbox table through the event bus.
+
+    Each round claims up to ``batch_size`` pending messages in position
+    order by leasing them for ``lease`` with a single
+    ``UPDATE ... WHERE position IN (SELECT ... FOR UPDATE SKIP LOCKED)``,
+    so several relays can poll the same table without blocking each other.
+    On SQLite, which has no row locks, the lease condition in the UPDATE
+    does the claiming. Messages are marked as published after the bus
+    accepts them. ``DomainEventPublishError`` also counts as delivered: the
+    failed (event, subscriber) pairs are already in the bus failover and
+    replaying the batch would run the other subscribers again. If
+    publishing fails otherwise they are released for a later round,
+    up to ``max_attempts`` claims, and a relay that dies mid-batch leaves
+    them to be claimed again when the lease expires. Delivery is
+    at-least-once. Messages that used up their attempts are dead-lettered
+    (``dead_lettered_at``) and logged by the next round, and
+    ``requeue_dead_letters`` makes them claimable again.
+
+    Usage:
+        relay = OutboxRelay(async_sessionmaker(engine), event_bus, registry)
+        await relay.start()
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        event_bus: EventBus,
+        registry: DomainEventRegistry,
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+        lease: timedelta = timedelta(seconds=30),
+        max_attempts: int = 10
+    ):
+        self._session_factory = session_factory
+        self._event_bus = event_bus
+        self._registry = registry
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._lease = lease
+        self._max_attempts = max_attempts
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start polling in a background task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop polling. Messages claimed by an interrupted round are retried once their lease expires"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def relay_once(self) -> int:
+        """Claim and publish one batch. Returns the number of published events"""
+        messages = await self._claim()
+        if not messages:
+            return 0
+
+        events: List[DomainEvent] = []
+        positions: List[int] = []
+        for position, payload in messages:
+            try:
+                events.append(self._registry.deserialize(json.loads(payload)))
+                positions.append(position)
+            except Exception as e:
+                logger.error(f"Cannot read outbox message {position}: {str(e)}")
+                await self._release([position], str(e))
+
+        if not events:
+            return 0
+        try:
+            await self._event_bus.publish(events)
+        except DomainEventPublishError as e:
+            logger.warning(f"{len(e.failures)} outbox deliveries failed and went to failover: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error relaying {len(events)} outbox events: {str(e)}")
+            await self._release(positions, str(e))
+            return 0
+
+        await self._mark_published(positions)
+        return len(events)
+
+    async def purge_published(self, older_than: timedelta) -> int:
+        """Delete messages published more than ``older_than`` ago"""
+        async with self._session_factory() as session:
+            async with session.begin():
+                result = await session.execute(
+                    delete(OutboxMessageModel).where(
+                        OutboxMessageModel.published_at < datetime.utcnow() - older_than
+                    )
+                )
+        return result.rowcount
+
+    async def requeue_dead_letters(self, positions: Optional[List[int]] = None) -> int:
+        """Give dead-lettered messages, or only those at ``positions``, a new
+        set of attempts. Returns the number of messages requeued"""
+        model = OutboxMessageModel
+        statement = update(model).where(model.dead_lettered_at.is_not(None))
+        if positions is not None:
+            statement = statement.where(model.position.in_(positions))
+        async with self._session_factory() as session:
+            async with session.begin():
+                result = await session.execute(
+                    statement.values(dead_lettered_at=None, attempts=0)
+                    .execution_options(synchronize_session=False)
+                )
+        return result.rowcount
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                published = await self.relay_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Outbox relay failed: {str(e)}")
+                published = 0
+            # A full batch means more messages are probably waiting
+            if published < self._batch_size:
+                await asyncio.sleep(self._poll_interval)
+
+    async def _claim(self) -> List[Tuple[int, str]]:
+        now = datetime.utcnow()
+        model = OutboxMessageModel
+        pending = (
+            model.published_at.is_(None),
+            model.dead_lettered_at.is_(None),
+            or_(model.locked_until.is_(None), model.locked_until < now)
+        )
+        claimable = (*pending, model.attempts < self._max_attempts)
+        candidates = (
+            select(model.position)
+            .where(*claimable)
+            .order_by(model.position)
+            .limit(self._batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with self._session_factory() as session:
+            async with session.begin():
+                await self._dead_letter_exhausted(session, pending, now)
+                result = await session.execute(
+                    update(model)
+                    .where(model.position.in_(candidates.scalar_subquery()), *claimable)
+                    .values(locked_until=now + self._lease, attempts=model.attempts + 1)
+                    .returning(model.position, model.payload)
+                    .execution_options(synchronize_session=False)
+                )
+                messages = [(row.position, row.payload) for row in result]
+        # RETURNING does not keep the subquery order
+        return sorted(messages)
+
+    async def _dead_letter_exhausted(self, session: AsyncSession, pending: Tuple[Any, ...], now: datetime) -> None:
+        """Dead-letter the pending messages that used up their attempts, which
+        would otherwise stay unpublished without ever being claimed again"""
+        model = OutboxMessageModel
+        result = await session.execute(
+            update(model)
+            .where(*pending, model.attempts >= self._max_attempts)
+            .values(dead_lettered_at=now, locked_until=None)
+            .returning(model.position, model.event_type, model.last_error)
+            .execution_options(synchronize_session=False)
+        )
+        for row in result:
+            logger.error(
+                f"Outbox message {row.position} ({row.event_type}) dead-lettered after "
+                f"{self._max_attempts} attempts: {row.last_error}"
+            )
+
+    async def _mark_published(self, positions: List[int]) -> None:
+        async with self._session_factory() as session:
+            async with session.begin():
+                await session.execute(
+                    update(OutboxMessageModel)
+                    .where(OutboxMessageModel.position.in_(positions))
+                    .values(published_at=datetime.utcnow(), locked_until=None, last_error=None)
+                    .execution_options(synchronize_session=False)
+                )
+
+    async def _release(self, positions: List[int], error: str) -> None:
+        """Make messages claimable again on the next round"""
+        async with self._session_factory() as session:
+            async with session.begin():
+                await session.execute(
+                    update(OutboxMessageModel)
+                    .where(OutboxMessageModel.position.in_(positions))
+                    .values(locked_until=None, last_error=error)
+                    .execution_options(synchronize_session=False)
+                )
@@ -1,41 +1,220 @@
-from typing import Generic, TypeVar, Type, Optional, List
+from typing import Any, AsyncIterator, ClassVar, Dict, Generic, Iterable, TypeVar, Type, Optional, List, Sequence, Tuple
+from functools import partial
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import delete, inspect, select
 from sqlalchemy.orm import DeclarativeMeta
+from sqlalchemy.sql import Select
 from ....domain.aggregate import AggregateRoot
+from ....domain.criteria.criteria import Criteria
+from ..entity_cache import EntityCache
+from ..identity_map import IdentityMap
 from ..repository import Repository
+from .bulk_insert import bulk_insert, bulk_insert_returning
+from .criteria_converter import CriteriaConverter, Page
 
 Model = TypeVar('Model', bound=DeclarativeMeta)
 Entity = TypeVar('Entity', bound=AggregateRoot)
 
 class SQLAlchemyRepository(Repository[Entity], Generic[Entity, Model]):
-    def __init__(self, session: AsyncSession, model_class: Type[Model], entity_class: Type[Entity]):
+    """Base SQLAlchemy repository.
+
+    Inside a ``SqlAlchemyUnitOfWork`` lookups by id go through the unit of
+    work's identity map, and with an ``entity_cache`` through a read-through
+    cache shared between requests before querying. There ``save`` and
+    ``delete`` only flush and the unit of work commits; without one each
+    of them commits.
+    """
+    # Model attributes that criteria can filter and order by
+    criteria_fields: ClassVar[Tuple[str, ...]] = ()
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        model_class: Type[Model],
+        entity_class: Type[Entity],
+        chunk_size: int = 500,
+        entity_cache: Optional[EntityCache] = None
+    ):
         self._session = session
         self._model_class = model_class
         self._entity_class = entity_class
+        self._chunk_size = chunk_size
+        self._entity_cache = entity_cache
+        self._versioned = 'version' in inspect(model_class).column_attrs
+        self._criteria = CriteriaConverter(model_class, self.criteria_fields)
 
     async def save(self, aggregate: Entity) -> None:
         model = self._to_model(aggregate)
         self._session.add(model)
-        await self._session.commit()
+        await self._commit()
         await self._session.refresh(model)
+        await self._written([aggregate.id])
+        self._remember(aggregate.id, aggregate)
+
+    async def save_many(self, aggregates: Iterable[Entity]) -> None:
+        """Insert aggregates with multi-row INSERTs of ``chunk_size`` rows.
+        Nothing is committed; the unit of work commits"""
+        await self._bulk_write(aggregates)
+
+    async def upsert_many(
+        self,
+        aggregates: Iterable[Entity],
+        update_columns: Optional[Iterable[str]] = None
+    ) -> None:
+        """Like ``save_many``, updating the rows whose id already exists.
+        Only ``update_columns`` are overwritten, by default all but ``created_at``"""
+        await self._bulk_write(aggregates, upsert=True, update_columns=update_columns)
 
     async def search_by_id(self, id: str) -> Optional[Entity]:
-        result = await self._session.execute(
-            select(self._model_class).where(self._model_class.id == id)
-        )
-        model = result.scalar_one_or_none()
-        return self._to_entity(model) if model else None
+        """Aggregate with ``id``, the same instance for every lookup in a unit of work"""
+        identity_map = IdentityMap.of(self._session)
+        if identity_map is not None:
+            aggregate = identity_map.get(self._entity_class, id)
+            if aggregate is not None:
+                return aggregate
+        model = await self._find_model(id, identity_map)
+        if model is None:
+            return None
+        aggregate = self._to_entity(model)
+        self._remember(id, aggregate)
+        return aggregate
 
     async def search_all(self) -> List[Entity]:
         result = await self._session.execute(select(self._model_class))
         return [self._to_entity(model) for model in result.scalars().all()]
 
+    async def search_by_criteria(self, criteria: Criteria) -> List[Entity]:
+        """Aggregates matching ``criteria``, with its order, offset and limit"""
+        result = await self._session.execute(self._criteria.select(criteria))
+        return [self._to_entity(model) for model in result.scalars().all()]
+
+    async def search_page(self, criteria: Criteria, after: Optional[Sequence[Any]] = None) -> Page[Entity]:
+        """Page of ``criteria.limit`` aggregates after the key returned with the
+        previous page (keyset pagination)"""
+        result = await self._session.execute(self._criteria.select(criteria, after))
+        models = result.scalars().all()
+        return Page([self._to_entity(model) for model in models], self._criteria.next_after(criteria, models))
+
+    async def stream_all(self, yield_per: int = 1000) -> AsyncIterator[Entity]:
+        """Iterate over every aggregate with a server-side cursor, fetching and
+        mapping ``yield_per`` rows at a time so memory does not grow with the table"""
+        async for aggregate in self._stream(select(self._model_class), yield_per):
+            yield aggregate
+
+    async def stream_by_criteria(self, criteria: Criteria, yield_per: int = 1000) -> AsyncIterator[Entity]:
+        """Like ``stream_all`` for the aggregates matching ``criteria``"""
+        async for aggregate in self._stream(self._criteria.select(criteria), yield_per):
+            yield aggregate
+
     async def delete(self, id: str) -> None:
         await self._session.execute(
             delete(self._model_class).where(self._model_class.id == id)
         )
-        await self._session.commit()
+        await self._commit()
+        await self._written([id])
+        identity_map = IdentityMap.of(self._session)
+        if identity_map is not None:
+            identity_map.remove(self._entity_class, id)
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit and miss counters of the identity map and the entity cache"""
+        stats = {}
+        identity_map = IdentityMap.of(self._session)
+        if identity_map is not None:
+            stats['identity_map'] = identity_map.stats.to_primitives()
+        if self._entity_cache is not None:
+            stats['entity_cache'] = self._entity_cache.stats.to_primitives()
+        return stats
+
+    async def _bulk_write(
+        self,
+        aggregates: Iterable[Entity],
+        upsert: bool = False,
+        update_columns: Optional[Iterable[str]] = None
+    ) -> None:
+        """Write aggregates in bulk, then give them the version each row was
+        left at (an upsert increments it) and mark them clean"""
+        aggregates = list(aggregates)
+        models = [self._to_model(aggregate) for aggregate in aggregates]
+        if self._versioned:
+            rows = await bulk_insert_returning(
+                self._session,
+                self._model_class,
+                models,
+                ('id', 'version'),
+                self._chunk_size,
+                upsert=upsert,
+                update_columns=update_columns
+            )
+            versions = dict(rows)
+            for aggregate, model in zip(aggregates, models):
+                aggregate.version = versions[model.id]
+        else:
+            await bulk_insert(
+                self._session,
+                self._model_class,
+                models,
+                self._chunk_size,
+                upsert=upsert,
+                update_columns=update_columns
+            )
+        for aggregate in aggregates:
+            aggregate.mark_clean()
+        await self._written_many(aggregates)
+
+    async def _find_model(self, id: str, identity_map: Optional[IdentityMap]) -> Optional[Model]:
+        """Model from the entity cache or the database. Ids written in the
+        current transaction skip the cache, which must only hold committed rows"""
+        entity_cache = self._entity_cache
+        if entity_cache is None or (identity_map is not None and identity_map.was_written(self._entity_class, id)):
+            return await self._select_by_id(id)
+        return await entity_cache.get_or_load(self._model_class, id, partial(self._select_by_id, id))
+
+    async def _commit(self) -> None:
+        """Commit, unless the session belongs to a ``SqlAlchemyUnitOfWork``:
+        then only flush, and the unit of work commits the writes together
+        with its outbox messages"""
+        if IdentityMap.of(self._session) is None:
+            await self._session.commit()
+        else:
+            await self._session.flush()
+
+    async def _select_by_id(self, id: str) -> Optional[Model]:
+        result = await self._session.execute(
+            select(self._model_class).where(self._model_class.id == id)
+        )
+        return result.scalar_one_or_none()
+
+    def _remember(self, id: Any, aggregate: Entity) -> None:
+        identity_map = IdentityMap.of(self._session)
+        if identity_map is not None:
+            identity_map.add(self._entity_class, id, aggregate)
+
+    async def _written_many(self, aggregates: List[Entity]) -> None:
+        await self._written([aggregate.id for aggregate in aggregates])
+        for aggregate in aggregates:
+            self._remember(aggregate.id, aggregate)
+
+    async def _written(self, ids: List[Any]) -> None:
+        """Drop written ids from the entity cache now and again after the unit
+        of work commits, since other requests may cache the old row meanwhile"""
+        identity_map = IdentityMap.of(self._session)
+        if identity_map is not None:
+            identity_map.mark_written(self._entity_class, ids)
+        if self._entity_cache is not None:
+            await self._entity_cache.invalidate(self._model_class, ids)
+            if identity_map is not None:
+                identity_map.after_commit(partial(self._entity_cache.invalidate, self._model_class, ids))
+
+    async def _stream(self, statement: Select, yield_per: int) -> AsyncIterator[Entity]:
+        result = await self._session.stream(statement.execution_options(yield_per=yield_per))
+        try:
+            # Models are only held weakly by the session, so each chunk is freed once mapped
+            async for models in result.scalars().partitions():
+                for model in models:
+                    yield self._to_entity(model)
+        finally:
+            await result.close()
 
     def _to_model(self, entity: Entity) -> Model:
         """Convert domain entity to SQLAlchemy model"""
@@ -4,7 +4,7 @@ import logging
 
 from .unit_of_work import UnitOfWork, transaction_context
 from ...domain.events import DomainEvent
-from ..event_bus.in_memory_event_bus import InMemoryEventBus
+from ...domain.event_bus import EventBus, InMemoryEventBus
 
 T = TypeVar('T')
 logger = logging.getLogger(__name__)
@@ -16,10 +16,14 @@ class TransactionManager:
     def __init__(
         self,
         uow: UnitOfWork,
-        event_bus: Optional[InMemoryEventBus] = None
+        event_bus: Optional[EventBus] = None,
+        use_outbox: bool = False
     ):
         self.uow = uow
         self.event_bus = event_bus or InMemoryEventBus()
+        # Write events to the outbox table in the transaction instead of
+        # publishing them; an OutboxRelay delivers them afterwards
+        self.use_outbox = use_outbox
         self._pending_events: list[DomainEvent] = []
     
     def add_event(self, event: DomainEvent) -> None:
@@ -29,8 +33,8 @@ class TransactionManager:
     async def _publish_events(self) -> None:
         """Publish all pending domain events"""
         try:
-            for event in self._pending_events:
-                await self.event_bus.publish(event)
+            if self._pending_events:
+                await self.event_bus.publish(list(self._pending_events))
         except Exception as e:
             logger.error(f"Error publishing events: {str(e)}")
             raise
@@ -53,18 +57,22 @@ class TransactionManager:
         """
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> T:
-            async with transaction_context(self.uow) as uow:
-                try:
+            try:
+                async with transaction_context(self.uow) as uow:
                     # Execute the function
                     result = await func(*args, **kwargs)
-                    
-                    # Publish events after successful commit
-                    await self._publish_events()
-                    
-                    return result
-                except Exception:
-                    # Clear pending events on error
-                    self._pending_events.clear()
-                    raise
+
+                    if self.use_outbox:
+                        uow.add_events(self._pending_events)
+                        self._pending_events.clear()
+            except Exception:
+                # Clear pending events on error
+                self._pending_events.clear()
+                raise
+
+            # Publish events after successful commit
+            await self._publish_events()
+
+            return result
         
         return wrapper
@@ -1,9 +1,16 @@
 from abc import ABC, abstractmethod
-from typing import AsyncContextManager
+from typing import AsyncContextManager, List
 from contextlib import asynccontextmanager
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ...domain.events import DomainEvent
+from ..event_bus.domain_event_compiled_serializer import DomainEventCompiledSerializer
+from .identity_map import IdentityMap
+from .postgresql.models import OutboxMessageModel
+
+_event_serializer = DomainEventCompiledSerializer()
+
 
 class UnitOfWork(ABC):
     """Abstract base class for unit of work pattern"""
@@ -28,6 +35,11 @@ class UnitOfWork(ABC):
         """Cleanup any resources"""
         pass
     
+    @abstractmethod
+    def add_events(self, events: List[DomainEvent]) -> None:
+        """Store domain events in the outbox so they commit with the transaction"""
+        pass
+    
     @abstractmethod
     def __aenter__(self) -> 'UnitOfWork':
         """Enter the async context"""
@@ -40,14 +52,21 @@ class UnitOfWork(ABC):
 
 
 class SqlAlchemyUnitOfWork(UnitOfWork):
-    """SQLAlchemy implementation of unit of work pattern"""
+    """SQLAlchemy implementation of unit of work pattern.
+
+    Repositories on ``session`` share ``identity_map``, which lives for one
+    transaction.
+    """
     
     def __init__(self, session: AsyncSession):
         self.session = session
         self.transaction = None
+        self.identity_map = IdentityMap()
+        session.info[IdentityMap.SESSION_KEY] = self.identity_map
     
     async def begin(self) -> None:
         """Begin a new transaction"""
+        self.identity_map.clear()
         self.transaction = await self.session.begin()
     
     async def commit(self) -> None:
@@ -57,15 +76,31 @@ class SqlAlchemyUnitOfWork(UnitOfWork):
         except:
             await self.rollback()
             raise
+        await self.identity_map.committed()
     
     async def rollback(self) -> None:
         """Rollback the current transaction"""
         await self.session.rollback()
+        self.identity_map.clear()
     
     async def cleanup(self) -> None:
         """Cleanup the session"""
+        self.identity_map.clear()
         await self.session.close()
     
+    def add_events(self, events: List[DomainEvent]) -> None:
+        """Store domain events in the outbox table, flushed with the rest of the transaction"""
+        self.session.add_all([
+            OutboxMessageModel(
+                event_id=str(event.event_id),
+                event_type=type(event).__name__,
+                aggregate_id=str(event.aggregate_id),
+                payload=_event_serializer.serialize(event).decode(),
+                occurred_on=event.occurred_on
+            )
+            for event in events
+        ])
+    
     async def __aenter__(self) -> 'SqlAlchemyUnitOfWork':
         """Enter the async context"""
         await self.begin()
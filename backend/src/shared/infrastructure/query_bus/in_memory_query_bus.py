@@ -1,21 +1,49 @@
-from typing import Type, TypeVar, Generic
+from typing import Dict, Optional, Sequence, Type, TypeVar, Generic
 from ...domain.query import Query
 from ...domain.response import Response
 from ...domain.query_bus import QueryBus
 from ...domain.query_handler import QueryHandler
+from ..dependency_injection.container import Container
+from ..middleware.middleware import Handle, Middleware, build_pipeline
 from .query_handlers import QueryHandlers
 
 Q = TypeVar('Q', bound=Query)
 R = TypeVar('R', bound=Response)
 
 class InMemoryQueryBus(QueryBus[Q, R], Generic[Q, R]):
-    def __init__(self, query_handlers: QueryHandlers[Q, R]):
+    def __init__(
+        self,
+        query_handlers: QueryHandlers[Q, R],
+        container: Optional[Container] = None,
+        middlewares: Sequence[Middleware] = ()
+    ):
         self._query_handlers = query_handlers
+        self._container = container
+        self._middlewares = list(middlewares)
+        self._pipelines: Dict[Type[Q], Handle] = {}
 
     async def ask(self, query: Q) -> R:
-        handler_class = self._query_handlers.get(query)
-        handler = handler_class()
-        return await handler.handle(query)
+        pipeline = self._pipelines.get(type(query))
+        if pipeline is None:
+            pipeline = self._build_pipeline(type(query), self._query_handlers.get(query))
+        return await pipeline(query)
 
     def register(self, query_class: Type[Q], handler: Type[QueryHandler[Q, R]]) -> None:
         self._query_handlers.register(query_class, handler)
+        # Subclasses may now resolve to a different handler
+        self._pipelines.clear()
+        self._build_pipeline(query_class, handler)
+
+    def _build_pipeline(self, query_class: Type[Q], handler_class: Type[QueryHandler[Q, R]]) -> Handle:
+        async def handle(query: Q) -> R:
+            return await self._resolve(handler_class).handle(query)
+
+        pipeline = build_pipeline(self._middlewares, query_class, handler_class, handle)
+        self._pipelines[query_class] = pipeline
+        return pipeline
+
+    def _resolve(self, handler_class: Type[QueryHandler[Q, R]]) -> QueryHandler[Q, R]:
+        """Handlers not registered in the container are built for each message"""
+        if self._container is None:
+            return handler_class()
+        return self._container.resolve_or_register(handler_class)
@@ -0,0 +1,127 @@
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, List, Optional, Set, Type, TypeVar
+from ...domain.events import DomainEvent
+from ...domain.domain_event_subscriber import DomainEventSubscriber
+from ...domain.query import Query
+from ...domain.query_handler import QueryHandler
+from ...domain.response import Response
+from ..event_bus.domain_event_subscribers import DomainEventSubscribers
+from ..persistence.redis.cache_key import build_cache_key, qualified_name
+from ..persistence.redis.cache_service import CacheService
+from ..middleware.middleware import Handle, Middleware
+
+Q = TypeVar('Q', bound=Query)
+R = TypeVar('R', bound=Response)
+
+
+class QueryCache(Middleware):
+    """Query bus middleware that caches responses of handlers declaring a ``cache_ttl``.
+
+    Entries are tagged with the event types listed in the handler's
+    ``invalidated_by`` (plus the aggregate id from ``cache_aggregate_id``),
+    and dropped when a matching event is published. Register the class
+    returned by ``subscriber()`` in the event bus and pass its
+    ``subscribers``: handlers are registered here as their pipelines are
+    built, and the subscriber index is refreshed whenever that adds event
+    types.
+
+    A miss takes a lease on the key, tagged like the entry, before running
+    the handler. Invalidating the tags revokes it, so a response computed
+    before a matching event was published is not stored after it. Only the
+    caller holding the lease stores the response.
+    """
+
+    def __init__(
+        self,
+        cache: CacheService,
+        subscribers: Optional[DomainEventSubscribers] = None,
+        lease_timeout: timedelta = timedelta(seconds=5)
+    ):
+        self._cache = cache
+        self._subscribers = subscribers
+        self._lease_timeout = lease_timeout
+        self._event_types: Set[Type[DomainEvent]] = set()
+        self._subscriber = self._build_subscriber()
+
+    def register(self, handler_class: Type[QueryHandler]) -> None:
+        """Track the events that invalidate responses of ``handler_class``"""
+        event_types = set(handler_class.invalidated_by) - self._event_types
+        if not event_types:
+            return
+        self._event_types.update(event_types)
+        if self._subscribers is not None:
+            self._subscribers.refresh()
+
+    def wrap(self, message_class: type, handler_class: Type[QueryHandler], next_handle: Handle) -> Handle:
+        if not self.is_cacheable(handler_class):
+            return next_handle
+        self.register(handler_class)
+
+        async def handle(query: Query) -> Any:
+            return await self.ask(query, handler_class, lambda: next_handle(query))
+
+        return handle
+
+    @staticmethod
+    def is_cacheable(handler_class: Type[QueryHandler]) -> bool:
+        return handler_class.cache_ttl is not None
+
+    async def ask(
+        self,
+        query: Q,
+        handler_class: Type[QueryHandler[Q, R]],
+        handle: Callable[[], Awaitable[R]]
+    ) -> R:
+        """Return the cached response or run ``handle`` and cache its result"""
+        key = build_cache_key(qualified_name(handler_class), query)
+        response = await self._cache.get(key)
+        if response is not None:
+            return response
+
+        tags = self._tags(handler_class, query)
+        lease = await self._cache.acquire_lease(key, self._lease_timeout, tags)
+        stored = False
+        try:
+            response = await handle()
+            if response is not None and lease is not None:
+                stored = await self._cache.set_with_lease(key, response, lease, handler_class.cache_ttl, tags)
+        finally:
+            if lease is not None and not stored:
+                await self._cache.release_lease(key, lease)
+        return response
+
+    async def invalidate(self, domain_event: DomainEvent) -> None:
+        """Drop the responses made stale by ``domain_event``"""
+        tags: List[str] = []
+        for event_type in type(domain_event).__mro__:
+            if event_type in self._event_types:
+                tags.append(self._tag(event_type))
+                tags.append(self._tag(event_type, domain_event.aggregate_id))
+        if tags:
+            await self._cache.invalidate_tags(tags)
+
+    def subscriber(self) -> Type[DomainEventSubscriber]:
+        """Event subscriber that invalidates this cache"""
+        return self._subscriber
+
+    def _tags(self, handler_class: Type[QueryHandler], query: Query) -> List[str]:
+        aggregate_id = handler_class.cache_aggregate_id(query)
+        return [self._tag(event_type, aggregate_id) for event_type in handler_class.invalidated_by]
+
+    @staticmethod
+    def _tag(event_type: Type[DomainEvent], aggregate_id: str = None) -> str:
+        tag = f"event:{qualified_name(event_type)}"
+        return f"{tag}:{aggregate_id}" if aggregate_id is not None else tag
+
+    def _build_subscriber(self) -> Type[DomainEventSubscriber]:
+        query_cache = self
+
+        class QueryCacheInvalidator(DomainEventSubscriber):
+            async def on(self, domain_event: DomainEvent) -> None:
+                await query_cache.invalidate(domain_event)
+
+            @classmethod
+            def subscribed_to(cls) -> List[Type[DomainEvent]]:
+                return list(query_cache._event_types)
+
+        return QueryCacheInvalidator
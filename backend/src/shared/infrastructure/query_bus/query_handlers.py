@@ -1,4 +1,4 @@
-from typing import Dict, Type, TypeVar, Generic
+from typing import Dict, Optional, Type, TypeVar, Generic
 from ...domain.query import Query
 from ...domain.response import Response
 from ...domain.query_handler import QueryHandler
@@ -8,13 +8,34 @@ R = TypeVar('R', bound=Response)
 
 class QueryHandlers(Generic[Q, R]):
     def __init__(self):
-        self._handlers: Dict[str, Type[QueryHandler]] = {}
+        self._handlers: Dict[Type[Q], Type[QueryHandler]] = {}
+        # Concrete query type -> handler, including subclasses of registered queries
+        self._resolved: Dict[type, Optional[Type[QueryHandler]]] = {}
 
     def register(self, query_class: Type[Q], handler: Type[QueryHandler[Q, R]]) -> None:
-        self._handlers[query_class.__name__] = handler
+        registered = self._handlers.get(query_class)
+        if registered is not None and registered is not handler:
+            raise ValueError(
+                f'Query {query_class.__module__}.{query_class.__qualname__} '
+                f'already has handler {registered.__qualname__}'
+            )
+        self._handlers[query_class] = handler
+        self._resolved.clear()
 
     def get(self, query: Q) -> Type[QueryHandler[Q, R]]:
-        handler = self._handlers.get(query.__class__.__name__)
+        query_class = type(query)
+        try:
+            handler = self._resolved[query_class]
+        except KeyError:
+            handler = self._resolved[query_class] = self._resolve(query_class)
         if not handler:
-            raise ValueError(f'No handler registered for query {query.__class__.__name__}')
+            raise ValueError(f'No handler registered for query {query_class.__name__}')
         return handler
+
+    def _resolve(self, query_class: type) -> Optional[Type[QueryHandler[Q, R]]]:
+        """Handler of the closest registered class in the MRO"""
+        for klass in query_class.__mro__:
+            handler = self._handlers.get(klass)
+            if handler is not None:
+                return handler
+        return None
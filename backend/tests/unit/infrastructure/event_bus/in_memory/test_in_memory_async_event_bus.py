@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from typing import List, Type
+import asyncio
+
+import pytest
+
+from shared.domain.domain_event_subscriber import DomainEventSubscriber
+from shared.domain.events import DomainEvent
+from shared.infrastructure.event_bus.domain_event_failover_publisher.domain_event_failover_publisher import DomainEventFailoverPublisher
+from shared.infrastructure.event_bus.domain_event_subscribers import DomainEventSubscribers
+from shared.infrastructure.event_bus.in_memory.in_memory_async_event_bus import InMemoryAsyncEventBus
+
+
+@dataclass
+class CandidateApplied(DomainEvent):
+    process_id: str = ''
+
+
+received: List[str] = []
+
+
+class NotifyRecruiter(DomainEventSubscriber):
+    async def on(self, domain_event: DomainEvent) -> None:
+        received.append(f"notify:{domain_event.aggregate_id}")
+
+    @classmethod
+    def subscribed_to(cls) -> List[Type[DomainEvent]]:
+        return [CandidateApplied]
+
+
+class IndexCandidates(DomainEventSubscriber):
+    batch_size = 10
+    batch_window = 0.01
+
+    async def on(self, domain_event: DomainEvent) -> None:
+        raise AssertionError('batched subscribers get on_batch')
+
+    async def on_batch(self, domain_events: List[DomainEvent]) -> None:
+        received.append(f"index:{len(domain_events)}")
+
+    @classmethod
+    def subscribed_to(cls) -> List[Type[DomainEvent]]:
+        return [CandidateApplied]
+
+
+@pytest.fixture(autouse=True)
+def clear_received():
+    received.clear()
+
+
+def build_bus(tmp_path, subscribers, **options) -> InMemoryAsyncEventBus:
+    return InMemoryAsyncEventBus(
+        DomainEventSubscribers(list(subscribers)),
+        DomainEventFailoverPublisher(str(tmp_path / 'failover')),
+        **options
+    )
+
+
+def events(count: int) -> List[DomainEvent]:
+    return [CandidateApplied.create(f"candidate-{i}", process_id='process-1') for i in range(count)]
+
+
+@pytest.mark.parametrize('concurrent', [False, True], ids=['sequential', 'concurrent'])
+def test_publishes_to_every_subscriber(tmp_path, concurrent):
+    bus = build_bus(tmp_path, [NotifyRecruiter], concurrent=concurrent)
+
+    asyncio.run(bus.publish(events(3)))
+
+    assert received == ['notify:candidate-0', 'notify:candidate-1', 'notify:candidate-2']
+
+
+def test_batches_events_for_batch_subscribers(tmp_path):
+    bus = build_bus(tmp_path, [IndexCandidates])
+
+    asyncio.run(bus.publish(events(3)))
+
+    assert received == ['index:3']
+
+
+def test_subscribed_functions_receive_events_until_unsubscribed(tmp_path):
+    bus = build_bus(tmp_path, [])
+
+    async def on_applied(event: DomainEvent) -> None:
+        received.append(f"async:{event.aggregate_id}")
+
+    def on_applied_sync(event: DomainEvent) -> None:
+        received.append(f"sync:{event.aggregate_id}")
+
+    async def scenario() -> None:
+        bus.subscribe(CandidateApplied, on_applied)
+        bus.subscribe(CandidateApplied, on_applied_sync)
+        await bus.publish(events(1))
+        bus.unsubscribe(CandidateApplied, on_applied)
+        await bus.publish(events(1))
+
+    asyncio.run(scenario())
+
+    assert received == ['async:candidate-0', 'sync:candidate-0', 'sync:candidate-0']
@@ -0,0 +1,137 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+import json
+
+import pytest
+
+from shared.domain.events import DomainEvent
+from shared.domain.value_object.datetime import DateTime
+from shared.domain.value_object.percentage import Percentage
+from shared.domain.value_objects import StringValueObject
+from shared.infrastructure.event_bus import domain_event_compiled_serializer
+from shared.infrastructure.event_bus.domain_event_compiled_serializer import DomainEventCompiledSerializer
+from shared.infrastructure.event_bus.domain_event_json_serializer import DomainEventJsonSerializer
+from shared.infrastructure.event_bus.domain_event_registry import DomainEventRegistry
+
+
+class CandidateStatus(Enum):
+    NEW = 'NEW'
+    APPROVED = 'APPROVED'
+
+
+@dataclass(frozen=True)
+class CandidateName(StringValueObject):
+    pass
+
+
+@dataclass
+class CandidateEvaluated(DomainEvent):
+    status: CandidateStatus = CandidateStatus.NEW
+    score: Decimal = Decimal('0')
+    process_id: Optional[UUID] = None
+    skills: List[str] = field(default_factory=list)
+    evaluated_at: Optional[datetime] = None
+    interview_days: Tuple[date, ...] = ()
+    name: Optional[CandidateName] = None
+    ratings: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class CandidateMoved(DomainEvent):
+    process_id: str
+    stage: int
+
+
+@dataclass
+class CandidateScored(DomainEvent):
+    match: Percentage
+    scored_at: DateTime
+    previous_match: Optional[Percentage] = None
+
+
+@dataclass
+class CandidateTagged(DomainEvent):
+    tag: str = ''
+
+    def to_primitives(self) -> Dict[str, str]:
+        return {**DomainEvent.to_primitives(self), 'label': self.tag}
+
+    @classmethod
+    def from_primitives(cls, primitives: Dict[str, str]) -> 'CandidateTagged':
+        return cls(
+            event_id=primitives['event_id'],
+            occurred_on=datetime.fromisoformat(primitives['occurred_on']),
+            aggregate_id=primitives['aggregate_id'],
+            tag=primitives['label']
+        )
+
+
+EVENTS = [
+    CandidateEvaluated.create(
+        'candidate-1',
+        status=CandidateStatus.APPROVED,
+        score=Decimal('8.50'),
+        process_id=uuid4(),
+        skills=['python', 'sql'],
+        evaluated_at=datetime(2024, 5, 1, 10, 30, tzinfo=timezone.utc),
+        interview_days=(date(2024, 5, 2), date(2024, 5, 3)),
+        name=CandidateName('Ana'),
+        ratings={'technical': 4}
+    ),
+    CandidateMoved.create('candidate-2', process_id='process-1', stage=2),
+    CandidateTagged.create('candidate-3', tag='senior'),
+    CandidateScored.create(
+        'candidate-4',
+        match=Percentage('87.5'),
+        scored_at=DateTime(datetime(2024, 5, 1, 10, 30, tzinfo=timezone.utc)),
+        previous_match=Percentage(60)
+    ),
+]
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def serializer(request, monkeypatch):
+    if request.param == 'json':
+        monkeypatch.setattr(domain_event_compiled_serializer, 'orjson', None)
+    elif domain_event_compiled_serializer.orjson is None:
+        pytest.skip('orjson is not installed')
+    return DomainEventCompiledSerializer(DomainEventRegistry([CandidateEvaluated, CandidateMoved, CandidateTagged, CandidateScored]))
+
+
+@pytest.mark.parametrize('event', EVENTS, ids=lambda event: type(event).__name__)
+def test_round_trip_returns_an_equal_typed_event(serializer, event):
+    result = serializer.deserialize(serializer.serialize(event, {'subscriber': 'projection'}))
+
+    assert type(result) is type(event)
+    assert result == event
+
+
+def test_orjson_and_json_write_the_same_payload(monkeypatch):
+    if domain_event_compiled_serializer.orjson is None:
+        pytest.skip('orjson is not installed')
+    serializer = DomainEventCompiledSerializer()
+    with_orjson = [json.loads(serializer.serialize(event)) for event in EVENTS]
+    monkeypatch.setattr(domain_event_compiled_serializer, 'orjson', None)
+
+    assert [json.loads(serializer.serialize(event)) for event in EVENTS] == with_orjson
+
+
+def test_value_objects_are_written_as_their_primitives(serializer):
+    attributes = json.loads(serializer.serialize(EVENTS[3]))['data']['attributes']
+
+    assert (attributes['match'], attributes['scored_at'], attributes['previous_match']) == (
+        87.5,
+        '2024-05-01T10:30:00+00:00',
+        60.0
+    )
+
+
+def test_rejects_payloads_missing_required_fields(serializer):
+    legacy_payload = json.dumps(DomainEventJsonSerializer.serialize(EVENTS[1]))
+
+    with pytest.raises(ValueError, match='process_id, stage'):
+        serializer.deserialize(legacy_payload)
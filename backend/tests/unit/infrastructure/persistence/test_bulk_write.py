@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+# The repositories reach the Redis client, which reads the application's settings
+pytest.importorskip('shared.infrastructure.config')
+
+from sqlalchemy import Column, String
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from shared.domain.aggregate import AggregateRoot
+from shared.infrastructure.persistence.postgresql import repository as postgresql_repository
+from shared.infrastructure.persistence.postgresql.models import Base, BaseModel
+from shared.infrastructure.persistence.sqlalchemy import sqlalchemy_repository
+
+
+class StageModel(BaseModel):
+    __tablename__ = 'bulk_test_stages'
+    name = Column(String, nullable=False)
+
+
+class Stage(AggregateRoot):
+    def __init__(self, id: str, name: str):
+        super().__init__()
+        self.id = id
+        self.name = name
+
+
+class PostgresqlStageRepository(postgresql_repository.SQLAlchemyRepository):
+    def _to_model(self, stage: Stage) -> StageModel:
+        return StageModel(id=stage.id, name=stage.name)
+
+    def _to_entity(self, model: StageModel) -> Stage:
+        return Stage(model.id, model.name)
+
+
+class SqlAlchemyStageRepository(sqlalchemy_repository.SQLAlchemyRepository):
+    def _to_model(self, stage: Stage) -> StageModel:
+        return StageModel(id=stage.id, name=stage.name)
+
+    def _to_entity(self, model: StageModel) -> Stage:
+        return Stage(model.id, model.name)
+
+
+async def write_twice(repository_class):
+    engine = create_async_engine('sqlite+aiosqlite://')
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(engine) as session:
+        repository = repository_class(session, StageModel, Stage, chunk_size=2)
+        stages = [Stage(f"stage-{index}", 'Screening') for index in range(3)]
+        await repository.save_many(stages)
+        saved = [(stage.version, stage.dirty_fields) for stage in stages]
+
+        stages[0].name = 'Interview'
+        await repository.upsert_many([stages[0], Stage('stage-3', 'Offer')])
+        upserted = stages[0].version, stages[0].dirty_fields
+    await engine.dispose()
+    return saved, upserted
+
+
+@pytest.mark.parametrize(
+    'repository_class',
+    [PostgresqlStageRepository, SqlAlchemyStageRepository],
+    ids=lambda cls: cls.__name__
+)
+def test_bulk_writes_leave_entities_clean_at_the_row_version(repository_class):
+    saved, upserted = asyncio.run(write_twice(repository_class))
+
+    assert saved == [(1, frozenset())] * 3
+    assert upserted == (2, frozenset())
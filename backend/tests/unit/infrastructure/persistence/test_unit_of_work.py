@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+import asyncio
+
+import pytest
+
+# The repositories reach the Redis client, which reads the application's settings
+pytest.importorskip('shared.infrastructure.config')
+
+from sqlalchemy import Column, String, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from shared.domain.aggregate import AggregateRoot
+from shared.domain.events import DomainEvent
+from shared.infrastructure.persistence.postgresql import repository as postgresql_repository
+from shared.infrastructure.persistence.postgresql.models import Base, BaseModel, OutboxMessageModel
+from shared.infrastructure.persistence.sqlalchemy import sqlalchemy_repository
+from shared.infrastructure.persistence.transaction_manager import TransactionManager
+from shared.infrastructure.persistence.unit_of_work import SqlAlchemyUnitOfWork
+
+
+class ProcessModel(BaseModel):
+    __tablename__ = 'uow_test_processes'
+    name = Column(String, nullable=False)
+
+
+class Process(AggregateRoot):
+    def __init__(self, id: str, name: str):
+        super().__init__()
+        self.id = id
+        self.name = name
+
+
+@dataclass
+class ProcessCreated(DomainEvent):
+    name: str = ''
+
+
+class PostgresqlProcessRepository(postgresql_repository.SQLAlchemyRepository):
+    def _to_model(self, process: Process) -> ProcessModel:
+        return ProcessModel(id=process.id, name=process.name)
+
+    def _to_entity(self, model: ProcessModel) -> Process:
+        return Process(model.id, model.name)
+
+
+class SqlAlchemyProcessRepository(sqlalchemy_repository.SQLAlchemyRepository):
+    def _to_model(self, process: Process) -> ProcessModel:
+        return ProcessModel(id=process.id, name=process.name)
+
+    def _to_entity(self, model: ProcessModel) -> Process:
+        return Process(model.id, model.name)
+
+
+REPOSITORIES = [PostgresqlProcessRepository, SqlAlchemyProcessRepository]
+
+
+async def create_process(tmp_path, repository_class, fail: bool):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'uow.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    session = AsyncSession(engine, expire_on_commit=False)
+    uow = SqlAlchemyUnitOfWork(session)
+    manager = TransactionManager(uow, use_outbox=True)
+    repository = repository_class(session, ProcessModel, Process)
+
+    @manager.transactional
+    async def handle() -> None:
+        await repository.save(Process('process-1', 'Backend developer'))
+        manager.add_event(ProcessCreated.create('process-1', name='Backend developer'))
+        if fail:
+            raise RuntimeError('failed after save')
+
+    if fail:
+        with pytest.raises(RuntimeError):
+            await handle()
+    else:
+        await handle()
+
+    async with AsyncSession(engine) as check:
+        processes = await check.scalar(select(func.count()).select_from(ProcessModel))
+        messages = await check.scalar(select(func.count()).select_from(OutboxMessageModel))
+    await engine.dispose()
+    return processes, messages
+
+
+@pytest.mark.parametrize('repository_class', REPOSITORIES, ids=lambda cls: cls.__name__)
+def test_failure_after_save_keeps_neither_the_row_nor_its_events(tmp_path, repository_class):
+    assert asyncio.run(create_process(tmp_path, repository_class, fail=True)) == (0, 0)
+
+
+@pytest.mark.parametrize('repository_class', REPOSITORIES, ids=lambda cls: cls.__name__)
+def test_row_and_events_are_committed_together(tmp_path, repository_class):
+    assert asyncio.run(create_process(tmp_path, repository_class, fail=False)) == (1, 1)